@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from typing import Optional
+import os
+import secrets
+
+from database.setup import DEFAULT_CHUNK_SIZE, find_dataset, get_all_wine_ids
+from database.reload import reload_job
+from models.recommendation_model import recommendation_model
+from api.cache import response_cache
+from api.coalesce import request_coalescer
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+def verify_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """X-Admin-Token 헤더 확인 (ADMIN_TOKEN 환경변수가 없으면 관리자 API를 열지 않음)"""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if not admin_token:
+        raise HTTPException(status_code=503, detail="ADMIN_TOKEN이 설정되지 않아 관리자 API를 사용할 수 없습니다")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다")
+
+@router.post("/reload", status_code=202, dependencies=[Depends(verify_admin_token)])
+def start_reload(
+    dataset: str = "winemag",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    incremental: bool = False,
+):
+    """데이터 재적재를 백그라운드 작업으로 시작 (섀도 테이블 재구축 후 교체, 또는 증분 적재)"""
+    if find_dataset(dataset) is None:
+        raise HTTPException(status_code=404, detail=f"데이터셋을 찾을 수 없습니다: {dataset}")
+    if chunk_size <= 0:
+        raise HTTPException(status_code=400, detail="chunk_size는 1 이상이어야 합니다")
+    if not reload_job.start(dataset, chunk_size, incremental):
+        raise HTTPException(status_code=409, detail="이미 재적재 작업이 실행 중입니다")
+    return reload_job.status()
+
+@router.get("/reload/status", dependencies=[Depends(verify_admin_token)])
+def get_reload_status():
+    """재적재 작업 상태, 진행 단계, 처리 행 수와 rows/sec"""
+    return reload_job.status()
+
+@router.post("/model/reload", status_code=202, dependencies=[Depends(verify_admin_token)])
+def reload_model(version: Optional[str] = None, force: bool = False):
+    """새 모델 버전을 백그라운드에서 로드/검사한 뒤 교체 (결과는 /wines/model/status/에서 확인)"""
+    if not recommendation_model.reload_in_background(version, id_provider=get_all_wine_ids, force=force):
+        raise HTTPException(status_code=409, detail="이미 모델 교체 작업이 실행 중입니다")
+    return {"state": "started", "version": version or "LATEST"}
+
+@router.get("/cache/status", dependencies=[Depends(verify_admin_token)])
+def get_cache_status():
+    """응답 캐시 크기와 적중/미적중/제거 횟수"""
+    return response_cache.info()
+
+@router.post("/cache/clear", dependencies=[Depends(verify_admin_token)])
+def clear_cache():
+    """응답 캐시 비우기 (횟수는 유지)"""
+    response_cache.clear()
+    return response_cache.info()
+
+@router.get("/coalescing/status", dependencies=[Depends(verify_admin_token)])
+def get_coalescing_status():
+    """동일 요청 병합 횟수 (실제 계산 수, 진행 중인 계산을 기다려 결과를 공유한 요청 수)"""
+    return request_coalescer.info()
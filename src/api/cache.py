@@ -0,0 +1,237 @@
+"""
+조회 API 응답 캐시 (ASGI 미들웨어)
+경로 + 정규화된 쿼리 파라미터를 키로 응답 본문을 보관하고, 데이터 버전(적재 시 증가)이나
+모델 버전이 바뀌면 이전 항목은 쓰지 않음. 항목 수/바이트 수 한도를 넘으면 LRU로 제거하고 TTL이 지나면 만료.
+응답에는 본문 해시로 만든 ETag를 붙이고, If-None-Match가 같으면 304로 응답
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.concurrency import run_in_threadpool
+
+from database.setup import engine, get_data_version
+from models.recommendation_model import recommendation_model
+
+# 캐시 한도 (RESPONSE_CACHE_ENTRIES=0이면 캐시하지 않음)
+RESPONSE_CACHE_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES") or 1024)
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES") or 64 * 2**20)
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL") or 300)
+# 다른 프로세스(init_db.py)의 적재를 알아채기 위해 데이터 버전을 다시 읽는 주기 (초)
+DATA_VERSION_CHECK_INTERVAL = 1.0
+
+# 캐시하는 GET 경로 (목록/검색/통계/패싯/추천, 와인 상세)
+CACHEABLE_PATH = re.compile(
+    r"^/wines/(search/|search/text|stats/|facets/|recommendations/query|\d+|\d+/recommendations/)?$"
+)
+
+# 저장하지 않는 응답 헤더 (hop-by-hop 헤더, 다시 계산하는 content-length와 캐시가 붙이는 헤더)
+UNCACHED_HEADERS = frozenset({
+    b"connection", b"keep-alive", b"proxy-authenticate", b"proxy-authorization", b"te", b"trailer",
+    b"transfer-encoding", b"upgrade", b"content-length", b"etag", b"x-cache",
+})
+# 304 응답에도 그대로 보내는 헤더 (RFC 9110 15.4.5)
+NOT_MODIFIED_HEADERS = frozenset({b"cache-control", b"content-location", b"date", b"expires", b"vary"})
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: tuple
+    etag: str
+    versions: tuple
+    expires_at: float
+
+def normalize_query_string(query_string: bytes) -> str:
+    """빈 값을 빼고 이름순으로 정렬한 쿼리 문자열 (파라미터 순서가 달라도 같은 키)"""
+    params = parse_qsl(query_string.decode("latin-1"), keep_blank_values=False)
+    return urlencode(sorted(params))
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더(쉼표로 여러 개, W/ 접두사 허용)에 etag가 있는지 확인"""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or any(value.removeprefix("W/") == etag for value in candidates)
+
+class ResponseCache:
+    """응답 본문 LRU 캐시 (항목 수, 바이트 수, TTL 한도와 적중/미적중/제거 횟수 기록)"""
+    
+    def __init__(self, max_entries: int = RESPONSE_CACHE_ENTRIES, max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+                 ttl: float = RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+    
+    def get(self, key, versions) -> Optional[CachedResponse]:
+        """versions(데이터/모델 버전)가 같고 만료되지 않은 항목 (없으면 None, 미적중으로 기록)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.versions != versions:
+                    self._remove(key)
+                    self.invalidations += 1
+                    entry = None
+                elif entry.expires_at <= time.monotonic():
+                    self._remove(key)
+                    self.expirations += 1
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+    
+    def put(self, key, versions, body: bytes, headers) -> CachedResponse:
+        """응답 본문과 헤더 목록((이름, 값) 쌍, 같은 이름이 여러 번 있어도 그대로)을 보관"""
+        headers = tuple(
+            (name, value) for name, value in headers if name.lower() not in UNCACHED_HEADERS
+        )
+        entry = CachedResponse(body, headers, make_etag(body), versions, time.monotonic() + self.ttl)
+        # 한도의 절반을 넘는 큰 응답은 다른 항목을 모두 밀어내므로 보관하지 않음
+        if len(body) > self.max_bytes // 2:
+            return entry
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.bytes += len(body)
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return entry
+    
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.bytes -= len(entry.body)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+    
+    def info(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "not_modified": self.not_modified,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+def is_storable(headers) -> bool:
+    """캐시에 넣어도 되는 응답인지 (쿠키를 설정하거나 Cache-Control: no-store인 응답은 저장하지 않음)"""
+    for name, value in headers:
+        name = name.lower()
+        if name == b"set-cookie":
+            return False
+        if name == b"cache-control" and b"no-store" in value.lower():
+            return False
+    return True
+
+class VersionTracker:
+    """캐시 무효화 기준 (데이터 버전, 모델 버전). 데이터 버전은 DATA_VERSION_CHECK_INTERVAL마다 DB에서 다시 읽음"""
+    
+    def __init__(self, interval: float = DATA_VERSION_CHECK_INTERVAL):
+        self.interval = interval
+        self._data_version = None
+        self._checked_at = 0.0
+    
+    def _read_data_version(self):
+        with engine.connect() as conn:
+            return get_data_version(conn)
+    
+    async def current(self) -> tuple:
+        if self._data_version is None or time.monotonic() - self._checked_at >= self.interval:
+            self._data_version = await run_in_threadpool(self._read_data_version)
+            self._checked_at = time.monotonic()
+        model = recommendation_model.current()
+        return self._data_version, model.version if model is not None else None
+
+class ResponseCacheMiddleware:
+    """CACHEABLE_PATH의 GET 200 응답을 캐시하고 ETag/304 처리 (쿠키를 설정하거나 no-store인 응답은 캐시하지 않음)"""
+    
+    def __init__(self, app, cache: "ResponseCache" = None, versions: VersionTracker = None):
+        self.app = app
+        self.cache = cache or response_cache
+        self.versions = versions or VersionTracker()
+    
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] != "GET" or not self.cache.enabled
+                or not CACHEABLE_PATH.match(scope["path"])):
+            await self.app(scope, receive, send)
+            return
+        
+        key = (scope["path"], normalize_query_string(scope["query_string"]))
+        if_none_match = dict(scope["headers"]).get(b"if-none-match", b"").decode("latin-1")
+        versions = await self.versions.current()
+        entry = self.cache.get(key, versions)
+        if entry is not None:
+            await self._send_cached(send, entry, if_none_match, b"HIT")
+            return
+        
+        # 미적중: 응답을 모아 두었다가 200이면 캐시에 넣고 ETag를 붙여 전송
+        start, body_parts = None, []
+        
+        async def capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                body_parts.append(message.get("body", b""))
+        
+        await self.app(scope, receive, capture)
+        body = b"".join(body_parts)
+        if start is not None and start["status"] == 200 and is_storable(start["headers"]):
+            entry = self.cache.put(key, versions, body, start["headers"])
+            await self._send_cached(send, entry, if_none_match, b"MISS")
+            return
+        if start is not None:
+            await send(start)
+        await send({"type": "http.response.body", "body": body})
+    
+    async def _send_cached(self, send, entry: CachedResponse, if_none_match: str, cache_status: bytes):
+        """보관한 헤더에 ETag, X-Cache를 더해 응답 (If-None-Match가 맞으면 본문 없이 304)"""
+        headers = [(b"etag", entry.etag.encode()), (b"x-cache", cache_status)]
+        if etag_matches(if_none_match, entry.etag):
+            self.cache.not_modified += 1
+            headers += [(name, value) for name, value in entry.headers if name.lower() in NOT_MODIFIED_HEADERS]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers += [*entry.headers, (b"content-length", str(len(entry.body)).encode())]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
+
+# 전역 응답 캐시
+response_cache = ResponseCache()
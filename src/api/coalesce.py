@@ -0,0 +1,114 @@
+"""
+동일 요청 병합 (single-flight)
+같은 키의 계산이 진행 중이면 새 요청은 계산을 다시 하지 않고 진행 중인 계산이 끝나기를 기다려 결과를 함께 받음.
+동기 핸들러(FastAPI 스레드 풀)는 run(), 비동기 핸들러는 run_async()를 사용.
+결과는 여러 요청이 공유하므로 호출하는 쪽에서 수정하지 않아야 함
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Hashable
+
+class _Call:
+    """진행 중인 동기 계산 하나 (끝나면 done이 설정됨)"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class RequestCoalescer:
+    """키별로 진행 중인 계산을 하나만 실행하고 동시에 들어온 같은 요청과 결과를 공유"""
+    
+    def __init__(self):
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._calls = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+    
+    def run(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """fn()의 결과 (같은 key로 진행 중인 계산이 있으면 그 결과를 기다림, 예외도 그대로 전달)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._finish(self._calls, key, call.error)
+            call.done.set()
+    
+    async def run_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """await fn()의 결과 (비동기 버전, 같은 이벤트 루프의 요청끼리 병합)"""
+        while True:
+            with self._lock:
+                future = self._futures.get(key)
+                leader = future is None
+                if leader:
+                    future = self._futures[key] = asyncio.get_running_loop().create_future()
+                else:
+                    self.coalesced += 1
+            if leader:
+                break
+            try:
+                # 기다리던 요청이 취소되어도 진행 중인 계산에는 영향 없음
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # 계산하던 요청(클라이언트 연결 끊김 등)이 취소된 경우는 다시 시도
+                if not future.cancelled():
+                    raise
+        
+        error = None
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            error = e
+            future.set_exception(e)
+            # 기다리는 요청이 없어도 "exception was never retrieved" 경고가 나지 않도록 확인 처리
+            future.exception()
+            raise
+        finally:
+            self._finish(self._futures, key, error)
+    
+    def _finish(self, calls: dict, key, error):
+        with self._lock:
+            del calls[key]
+            self.executions += 1
+            if error is not None:
+                self.errors += 1
+    
+    def info(self) -> dict:
+        with self._lock:
+            in_flight = len(self._calls) + len(self._futures)
+        requests = self.executions + self.coalesced
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_rate": round(self.coalesced / requests, 4) if requests else None,
+            "errors": self.errors,
+            "in_flight": in_flight,
+        }
+
+# 추천/통계 등 비용이 큰 조회에 쓰는 전역 병합기
+request_coalescer = RequestCoalescer()
@@ -1,10 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException
+import base64
+import binascii
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, literal_column, tuple_
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
 
-from database.setup import get_db, Wine
+from database.setup import (
+    get_db, get_all_wine_ids, get_wine_key_hashes, get_neighbor_table_info, get_wine_statistics, get_data_version,
+    build_fts_match_query, lookup_condition,
+    Wine, WineNeighbor, wine_fts, WINE_FTS_TABLE, FTS_ENABLED,
+)
+from database.lookup import LOOKUP_COLUMNS, DEFAULT_MATCH_MODE, normalize_lookup_value, matches_lookup
+from database.catalog import wine_catalog, DEFAULT_FACET_LIMIT
 from models.recommendation_model import recommendation_model
+from api.coalesce import request_coalescer
+from models.vectorizer import normalize_query, extract_query_filters
 
 router = APIRouter(prefix="/wines", tags=["wines"])
 
@@ -27,13 +40,124 @@ class WineResponse(BaseModel):
     class Config:
         from_attributes = True
 
-@router.get("/", response_model=List[WineResponse])
-def get_all_wines(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """모든 와인 목록 조회"""
-    wines = db.query(Wine).offset(skip).limit(limit).all()
-    return wines
+class WinePage(BaseModel):
+    results: List[WineResponse]
+    limit: int
+    next_cursor: Optional[str]
 
-@router.get("/search/", response_model=List[WineResponse])
+class WineTextSearchHit(WineResponse):
+    score: float
+
+class WineTextSearchPage(BaseModel):
+    query: str
+    total: int
+    limit: int
+    offset: int
+    results: List[WineTextSearchHit]
+
+# country/variety/winery 일치 방식 (prefix/exact는 인덱스 사용, substring은 전체 스캔이라 느림)
+MatchMode = Literal["exact", "prefix", "substring"]
+
+# 전문 검색 BM25 열 가중치 (title, description, winery, variety, designation 순)
+FTS_COLUMN_WEIGHTS = (10.0, 1.0, 5.0, 5.0, 2.0)
+
+class BatchRecommendationRequest(BaseModel):
+    wine_ids: List[int] = Field(..., min_length=1, max_length=100)
+    top_k: int = Field(10, ge=1, le=100)
+    mode: Literal["exact", "approx"] = "exact"
+    n_probe: Optional[int] = Field(None, ge=1)
+
+# 목록/검색 페이지 크기
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(points: int, wine_id: int) -> str:
+    """페이지 마지막 와인의 정렬 키 (points, id) → 불투명 커서 문자열"""
+    payload = json.dumps([points, wine_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str):
+    """커서 문자열 → (points, id) (형식이 잘못되면 400)"""
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        points, wine_id = json.loads(payload)
+        return int(points), int(wine_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다")
+
+# 목록/검색 정렬 순서 (커서는 이 순서의 마지막 키)
+PAGE_ORDER = (Wine.points.desc(), Wine.id.desc())
+
+def keyset_condition(cursor: str):
+    """커서 위치보다 뒤인 행 조건 (PAGE_ORDER 기준)"""
+    points, wine_id = decode_cursor(cursor)
+    return tuple_(Wine.points, Wine.id) < tuple_(points, wine_id)
+
+def make_wine_page(wines, limit: int) -> WinePage:
+    """limit + 1개까지 조회한 결과 → 페이지 (limit개를 넘으면 다음 페이지가 있으므로 next_cursor)"""
+    next_cursor = encode_cursor(wines[limit - 1].points, wines[limit - 1].id) if len(wines) > limit else None
+    return WinePage(results=wines[:limit], limit=limit, next_cursor=next_cursor)
+
+def paginate_wines(query, limit: int, cursor: Optional[str]) -> WinePage:
+    """(points DESC, id DESC) 순서의 키셋 페이지 (커서 이후 limit개, 다음 페이지가 있으면 next_cursor)
+    
+    OFFSET 대신 직전 페이지의 마지막 정렬 키보다 뒤인 행부터 읽으므로 몇 번째 페이지든 비용이 같다.
+    """
+    if cursor is not None:
+        query = query.filter(keyset_condition(cursor))
+    return make_wine_page(query.order_by(*PAGE_ORDER).limit(limit + 1).all(), limit)
+
+def wine_search_conditions(country=None, variety=None, winery=None, min_price=None, max_price=None,
+                           min_points=None, max_points=None, match=DEFAULT_MATCH_MODE) -> list:
+    """검색 조건 목록 (값이 있는 항목만)"""
+    conditions = []
+    if country:
+        conditions.append(lookup_condition("country", country, match))
+    if variety:
+        conditions.append(lookup_condition("variety", variety, match))
+    if winery:
+        conditions.append(lookup_condition("winery", winery, match))
+    if min_price is not None:
+        conditions.append(Wine.price >= min_price)
+    if max_price is not None:
+        conditions.append(Wine.price <= max_price)
+    if min_points is not None:
+        conditions.append(Wine.points >= min_points)
+    if max_points is not None:
+        conditions.append(Wine.points <= max_points)
+    return conditions
+
+def catalog_page(db: Session, filters: dict, limit: int, cursor: Optional[str]) -> JSONResponse:
+    """paginate_wines와 같은 페이지를 메모리 내 카탈로그에서 만들어 바로 JSON으로 응답 (ORM/Pydantic 변환 없음)"""
+    data_version = get_data_version(db.connection())
+    return catalog_page_response(wine_catalog.get(data_version), data_version, filters, limit, cursor)
+
+def catalog_response_headers(catalog, data_version: int) -> Optional[dict]:
+    """카탈로그를 다시 읽는 동안 이전 데이터 버전으로 만든 응답은 응답 캐시와 클라이언트가 저장하지 않도록 no-store"""
+    return {"Cache-Control": "no-store"} if catalog.data_version != data_version else None
+
+def catalog_page_response(catalog, data_version: int, filters: dict, limit: int, cursor: Optional[str]) -> JSONResponse:
+    """카탈로그에서 커서 이후 limit개 페이지 응답"""
+    after = decode_cursor(cursor) if cursor is not None else None
+    results, last_key = catalog.search_page(filters, limit, after)
+    return JSONResponse({
+        "results": results,
+        "limit": limit,
+        "next_cursor": encode_cursor(*last_key) if last_key is not None else None,
+    }, headers=catalog_response_headers(catalog, data_version))
+
+@router.get("/", response_model=WinePage)
+def get_all_wines(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """모든 와인 목록 조회 (점수 높은 순, 다음 페이지는 응답의 next_cursor를 cursor로 전달)"""
+    if wine_catalog.serving:
+        return catalog_page(db, {}, limit, cursor)
+    return paginate_wines(db.query(Wine), limit, cursor)
+
+@router.get("/search/", response_model=WinePage)
 def search_wines(
     country: Optional[str] = None,
     variety: Optional[str] = None,
@@ -42,65 +166,367 @@ def search_wines(
     max_price: Optional[float] = None,
     min_points: Optional[int] = None,
     max_points: Optional[int] = None,
+    match: MatchMode = DEFAULT_MATCH_MODE,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    """와인 검색"""
-    query = db.query(Wine)
+    """와인 검색 (점수 높은 순, 다음 페이지는 응답의 next_cursor를 cursor로 전달)
     
-    if country:
-        query = query.filter(Wine.country.ilike(f"%{country}%"))
-    if variety:
-        query = query.filter(Wine.variety.ilike(f"%{variety}%"))
-    if winery:
-        query = query.filter(Wine.winery.ilike(f"%{winery}%"))
-    if min_price is not None:
-        query = query.filter(Wine.price >= min_price)
-    if max_price is not None:
-        query = query.filter(Wine.price <= max_price)
-    if min_points is not None:
-        query = query.filter(Wine.points >= min_points)
-    if max_points is not None:
-        query = query.filter(Wine.points <= max_points)
+    country/variety/winery는 대소문자와 악센트를 무시하고 match 방식으로 비교합니다.
+    prefix(기본)와 exact는 정규화 컬럼 인덱스를 사용하며, substring(부분 일치)은 전체 스캔이라 느립니다.
+    SEARCH_BACKEND=catalog이면 같은 조건을 메모리 내 카탈로그의 마스크로 평가합니다.
+    """
+    if wine_catalog.serving:
+        filters = build_filters(country, variety, winery, min_price, max_price, min_points, max_points, match)
+        return catalog_page(db, filters, limit, cursor)
+    
+    query = db.query(Wine).filter(
+        *wine_search_conditions(country, variety, winery, min_price, max_price, min_points, max_points, match)
+    )
+    return paginate_wines(query, limit, cursor)
+
+@router.get("/search/text", response_model=WineTextSearchPage)
+def search_wines_text(
+    q: str = Query(..., min_length=1, max_length=200),
+    country: Optional[str] = None,
+    variety: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_points: Optional[int] = None,
+    max_points: Optional[int] = None,
+    match: MatchMode = DEFAULT_MATCH_MODE,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """제목/설명/와이너리/품종/designation 전문 검색 (BM25 순위, 페이지 단위)
+    
+    모든 단어를 포함하는 와인을 찾으며, 단어 끝에 *를 붙이면 접두어로 검색합니다 (예: q=cherr* oak).
+    """
+    if not FTS_ENABLED:
+        raise HTTPException(status_code=501, detail="전문 검색은 SQLite 데이터베이스에서만 지원됩니다")
+    fts_query = build_fts_match_query(q)
+    if fts_query is None:
+        raise HTTPException(status_code=422, detail="검색어에 단어가 없습니다")
+    
+    # bm25()는 작을수록 관련도가 높음 (응답 score는 부호를 바꿔 클수록 관련도가 높게)
+    rank = func.bm25(literal_column(WINE_FTS_TABLE), *FTS_COLUMN_WEIGHTS).label("rank")
+    hits = db.query(wine_fts.c.rowid.label("wine_id"), rank).filter(
+        literal_column(WINE_FTS_TABLE).op("MATCH")(fts_query)
+    )
+    conditions = wine_search_conditions(
+        country, variety, None, min_price, max_price, min_points, max_points, match
+    )
+    
+    if not conditions:
+        # 필터가 없으면 색인 안에서 세고 순위를 매긴 뒤 해당 페이지만 wines와 조인
+        total = hits.count()
+        page = hits.order_by(rank, wine_fts.c.rowid).offset(offset).limit(limit).subquery()
+        rows = (
+            db.query(Wine, page.c.rank)
+            .join(page, page.c.wine_id == Wine.id)
+            .order_by(page.c.rank, Wine.id)
+            .all()
+        )
+    else:
+        matched = hits.subquery()
+        query = db.query(Wine, matched.c.rank).join(matched, matched.c.wine_id == Wine.id).filter(*conditions)
+        total = query.count()
+        rows = query.order_by(matched.c.rank, Wine.id).offset(offset).limit(limit).all()
+    results = [
+        WineTextSearchHit(**WineResponse.model_validate(wine).model_dump(), score=-rank_value)
+        for wine, rank_value in rows
+    ]
+    return WineTextSearchPage(query=q, total=total, limit=limit, offset=offset, results=results)
+
+@router.get("/facets/")
+def get_wine_facets(
+    country: Optional[str] = None,
+    variety: Optional[str] = None,
+    winery: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_points: Optional[int] = None,
+    max_points: Optional[int] = None,
+    match: MatchMode = DEFAULT_MATCH_MODE,
+    facet_limit: int = Query(DEFAULT_FACET_LIMIT, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """검색과 같은 필터 조건에서의 패싯별 와인 수 (국가, 품종, 가격 구간, 점수 구간)
     
-    wines = query.all()
-    return wines
+    각 패싯은 자기 자신의 조건을 뺀 나머지 조건으로 셉니다 (예: country=France여도 다른 국가의 개수가 나옴).
+    메모리 내 카탈로그의 사전 인코딩된 열을 bincount로 세며, 데이터 버전이 바뀌면 카탈로그를 백그라운드에서 다시 읽습니다
+    (다 읽을 때까지는 이전 데이터 버전으로 세고, 응답의 data_version으로 확인 가능).
+    """
+    filters = build_filters(country, variety, winery, min_price, max_price, min_points, max_points, match)
+    data_version = get_data_version(db.connection())
+    catalog = wine_catalog.get(data_version)
+    return JSONResponse({
+        "total": catalog.count(filters),
+        "data_version": catalog.data_version,
+        "filters": filters,
+        "facets": catalog.facets(filters, facet_limit),
+    }, headers=catalog_response_headers(catalog, data_version))
 
 @router.get("/stats/")
 def get_wine_stats(db: Session = Depends(get_db)):
-    """와인 통계 정보"""
-    from database.setup import get_wine_statistics
-    return get_wine_statistics()
+    """와인 통계 정보 (적재가 끝날 때 미리 계산해 둔 wine_stats 한 행을 조회)"""
+    return request_coalescer.run(("stats",), lambda: get_wine_statistics(db))
 
 @router.get("/model/status/")
-def get_model_status():
-    """추천 모델 상태 확인"""
+def get_model_status(db: Session = Depends(get_db)):
+    """추천 모델 상태 확인 (로드된 모델이 있으면 현재 데이터와의 wine_id 대응도 검사)"""
+    model = recommendation_model.current()
+    if model is not None:
+        model.check_data(get_data_version(db.connection()), get_wine_key_hashes)
     return recommendation_model.get_model_info()
 
+def build_filters(country=None, variety=None, winery=None, min_price=None, max_price=None,
+                  min_points=None, max_points=None, match=DEFAULT_MATCH_MODE) -> dict:
+    """추천 필터 조건 (값이 있는 항목만, 문자열 조건이 있으면 일치 방식 포함)"""
+    filters = {
+        key: value for key, value in {
+            "country": country, "variety": variety, "winery": winery,
+            "min_price": min_price, "max_price": max_price,
+            "min_points": min_points, "max_points": max_points,
+        }.items() if value is not None and value != ""
+    }
+    if filters.keys() & {"country", "variety", "winery"}:
+        filters["match"] = match
+    return filters
+
+def wine_matches_filters(wine, filters: dict) -> bool:
+    """조회한 와인이 필터 조건을 만족하는지 (마스크를 만든 카탈로그보다 새로 바뀐 와인을 응답에서 제외)"""
+    match = filters.get("match", DEFAULT_MATCH_MODE)
+    for column in LOOKUP_COLUMNS:
+        if column in filters and not matches_lookup(
+            normalize_lookup_value(getattr(wine, column)), normalize_lookup_value(filters[column]), match
+        ):
+            return False
+    for column in ("price", "points"):
+        value = getattr(wine, column)
+        if f"min_{column}" in filters and (value is None or value < filters[f"min_{column}"]):
+            return False
+        if f"max_{column}" in filters and (value is None or value > filters[f"max_{column}"]):
+            return False
+    return True
+
+def filter_catalog(data_version: int, model, filters: dict):
+    """모델을 빌드한 뒤 데이터가 바뀌었으면 필터를 현재 값으로 평가할 카탈로그 (아니면 None, 모델의 속성 사용)
+    
+    증분 적재로 가격/국가/점수만 바뀐 와인은 원본 키가 같아 모델이 stale로 판정되지 않으므로,
+    빌드 때 저장한 속성으로 거르면 요청한 조건과 다른 와인을 추천하게 된다.
+    """
+    if not filters or model.data_version == data_version:
+        return None
+    # 이전 카탈로그로 거르면 바뀐 값이 반영되지 않으므로 현재 데이터 버전을 다 읽을 때까지 기다림
+    return wine_catalog.get(data_version, wait=True)
+
+MISSING_ATTRIBUTES_DETAIL = "현재 모델 버전에는 필터용 속성이 없습니다. src/build_model.py로 모델을 다시 빌드해주세요"
+
+def stale_model_error(model, check: dict) -> HTTPException:
+    """wine_id 대응이 어긋난 모델로 추천하지 않도록 반환하는 409 오류"""
+    return HTTPException(
+        status_code=409,
+        detail=(f"현재 모델 버전({model.version})은 데이터 버전 {check['model_data_version']}에서 빌드되어 "
+                f"데이터 버전 {check['data_version']}의 wine_id {check['mismatched_ids']}개와 맞지 않습니다. "
+                "src/build_model.py로 모델을 다시 빌드해주세요"),
+    )
+
+def require_current_data(db: Session, model):
+    """데이터가 바뀐 뒤에도 모델의 wine_id가 같은 와인을 가리키는지 확인 (데이터 버전마다 한 번 검사)"""
+    check = model.check_data(get_data_version(db.connection()), get_wine_key_hashes)
+    if check["stale"]:
+        raise stale_model_error(model, check)
+
+@router.get("/recommendations/query")
+def get_query_recommendations(
+    q: str = Query(..., min_length=1, max_length=500),
+    top_k: int = 10,
+    mode: Literal["exact", "approx"] = "exact",
+    n_probe: Optional[int] = None,
+    country: Optional[str] = None,
+    variety: Optional[str] = None,
+    winery: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_points: Optional[int] = None,
+    max_points: Optional[int] = None,
+    match: MatchMode = DEFAULT_MATCH_MODE,
+    db: Session = Depends(get_db)
+):
+    """자유 텍스트 취향 설명과 가까운 와인 목록 (예: q=crisp citrus, mineral, under 20)
+    
+    질의 벡터는 정규화된 질의 문자열 기준으로 캐시되며, "under 20" 같은 가격 상한은 필터로 적용됩니다.
+    """
+    model = recommendation_model.current()
+    if model is None:
+        recommendation_model.reload_in_background(id_provider=get_all_wine_ids)
+        raise HTTPException(status_code=503, detail="추천 모델이 아직 로드되지 않았습니다. 잠시 후 다시 시도해주세요")
+    if not model.has_vectorizer:
+        raise HTTPException(
+            status_code=409,
+            detail="현재 모델 버전에는 벡터라이저가 없습니다. src/build_model.py로 모델을 다시 빌드해주세요",
+        )
+    require_current_data(db, model)
+    
+    normalized = normalize_query(q)
+    filters = build_filters(country, variety, winery, min_price, max_price, min_points, max_points, match)
+    if filters and not model.has_attributes:
+        raise HTTPException(status_code=409, detail=MISSING_ATTRIBUTES_DETAIL)
+    if model.has_attributes:
+        # 명시한 필터가 질의에서 추출한 조건보다 우선
+        filters = {**extract_query_filters(normalized), **filters}
+    if mode == "approx" and not model.has_ann:
+        mode = "exact"
+    
+    def compute():
+        catalog = filter_catalog(get_data_version(db.connection()), model, filters)
+        recommended_wine_ids, _ = model.recommend_for_query(normalized, top_k, mode, n_probe, filters, catalog)
+        return {
+            "query": q,
+            "mode": mode,
+            "filters": filters,
+            **wine_list_response(db, recommended_wine_ids, filters),
+        }
+    
+    # 같은 질의/필터/모델 버전으로 동시에 들어온 요청은 계산 한 번의 결과를 공유
+    key = ("query_recommendations", model.version, q, top_k, mode, n_probe, tuple(sorted(filters.items())))
+    return request_coalescer.run(key, compute)
+
 @router.get("/{wine_id}/recommendations/")
-def get_recommendations(wine_id: int, top_k: int = 10, db: Session = Depends(get_db)):
-    """특정 와인에 대한 추천 와인 목록"""
-    wine = db.query(Wine).filter(Wine.id == wine_id).first()
-    if wine is None:
-        raise HTTPException(status_code=404, detail="와인을 찾을 수 없습니다")
+def get_recommendations(
+    wine_id: int,
+    top_k: int = 10,
+    mode: Literal["exact", "approx"] = "exact",
+    n_probe: Optional[int] = None,
+    country: Optional[str] = None,
+    variety: Optional[str] = None,
+    winery: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_points: Optional[int] = None,
+    max_points: Optional[int] = None,
+    match: MatchMode = DEFAULT_MATCH_MODE,
+    db: Session = Depends(get_db)
+):
+    """특정 와인에 대한 추천 와인 목록 (mode=approx는 ANN 인덱스 사용, n_probe로 탐색 범위 조정)
     
-    # 추천 모델이 로드되어 있는지 확인
-    if not recommendation_model.is_loaded:
-        # 모델이 로드되지 않은 경우 자동으로 로드 시도
-        if not recommendation_model.load_model():
-            raise HTTPException(status_code=503, detail="추천 모델을 로드할 수 없습니다")
+    검색과 같은 필터(country, variety, winery, 가격/점수 범위)를 주면 조건을 만족하는 와인 중에서 추천합니다.
+    """
+    # 요청 처리 동안 같은 모델 버전을 사용 (중간에 교체되어도 영향 없음)
+    model = recommendation_model.current()
+    if model is None:
+        if db.query(Wine.id).filter(Wine.id == wine_id).first() is None:
+            raise HTTPException(status_code=404, detail="와인을 찾을 수 없습니다")
+        # 요청을 디스크 I/O로 막지 않도록 로드는 백그라운드에서 시작만 함
+        recommendation_model.reload_in_background(id_provider=get_all_wine_ids)
+        raise HTTPException(status_code=503, detail="추천 모델이 아직 로드되지 않았습니다. 잠시 후 다시 시도해주세요")
+    require_current_data(db, model)
     
-    # 추천 와인 ID 목록 가져오기
-    recommended_wine_ids = recommendation_model.get_recommendations(wine_id, top_k)
+    # ANN 인덱스가 없는 모델이면 정확 검색으로 대체
+    if mode == "approx" and not model.has_ann:
+        mode = "exact"
     
-    # 추천된 와인들의 상세 정보 조회
-    recommended_wines = db.query(Wine).filter(Wine.id.in_(recommended_wine_ids)).all()
+    filters = build_filters(country, variety, winery, min_price, max_price, min_points, max_points, match)
+    if filters and not model.has_attributes:
+        raise HTTPException(status_code=409, detail=MISSING_ATTRIBUTES_DETAIL)
+    
+    # 인기 와인 페이지처럼 같은 추천 요청이 동시에 몰리면 DB 조회와 점수 계산은 한 번만 수행
+    key = ("recommendations", model.version, wine_id, top_k, mode, n_probe, tuple(sorted(filters.items())))
+    return request_coalescer.run(key, lambda: recommend_for_wine(db, model, wine_id, top_k, mode, n_probe, filters))
+
+def recommend_for_wine(db: Session, model, wine_id: int, top_k: int, mode: str, n_probe: Optional[int],
+                       filters: dict) -> dict:
+    """와인 추천 응답 (사전 계산된 이웃이 있으면 사용, 없으면 실시간 점수 계산)"""
+    if db.query(Wine.id).filter(Wine.id == wine_id).first() is None:
+        raise HTTPException(status_code=404, detail="와인을 찾을 수 없습니다")
+    
+    # 같은 모델 버전, 같은 데이터 버전으로 사전 계산된 이웃이 있고 top_k가 K 이하이면 인덱스 조인 한 번으로 응답
+    # (필터가 있으면 사전 계산 목록을 거르면 top_k개보다 적어질 수 있으므로 실시간 계산)
+    neighbor_info = get_neighbor_table_info(db)
+    if (not filters and neighbor_info is not None and neighbor_info["model_version"] == model.version
+            and neighbor_info["data_version"] == get_data_version(db.connection()) and top_k <= neighbor_info["k"]):
+        recommended_wines = (
+            db.query(Wine)
+            .join(WineNeighbor, WineNeighbor.neighbor_id == Wine.id)
+            .filter(WineNeighbor.wine_id == wine_id, WineNeighbor.rank < top_k)
+            .order_by(WineNeighbor.rank)
+            .all()
+        )
+        # 이웃이 삭제되었거나 이웃 계산 후 추가된 와인이면 top_k개가 안 되므로 실시간 계산으로 대체
+        if len(recommended_wines) == top_k:
+            recommendations = [WineResponse.model_validate(w) for w in recommended_wines]
+            return {
+                "wine_id": wine_id,
+                "mode": "precomputed",
+                "filters": filters,
+                "recommendations": recommendations,
+                "total_recommendations": len(recommendations)
+            }
+    
+    # 추천 와인 ID 목록 가져오기 (실시간 점수 계산, 필터는 점수 계산 전에 마스크로 적용)
+    catalog = filter_catalog(get_data_version(db.connection()), model, filters)
+    recommended_wine_ids = model.recommend(wine_id, top_k, mode, n_probe, filters, catalog)
     
     return {
         "wine_id": wine_id,
-        "recommendations": recommended_wines,
-        "total_recommendations": len(recommended_wines)
+        "mode": mode,
+        "filters": filters,
+        **wine_list_response(db, recommended_wine_ids, filters),
     }
 
+def wine_list_response(db: Session, wine_ids, filters: Optional[dict] = None) -> dict:
+    """추천된 와인들의 상세 정보 (유사도 순서 유지)
+    
+    병합된 요청들이 결과를 공유하므로 세션에 묶인 ORM 객체 대신 WineResponse로 변환해 둠
+    """
+    return ordered_wine_list(db.query(Wine).filter(Wine.id.in_(wine_ids)).all(), wine_ids, filters)
+
+def ordered_wine_list(wines, wine_ids, filters: Optional[dict] = None) -> dict:
+    """조회한 와인들을 wine_ids 순서로 정렬한 추천 목록 (없는 ID와 현재 값이 filters를 만족하지 않는 와인은 제외)"""
+    wines_by_id = {w.id: w for w in wines if not filters or wine_matches_filters(w, filters)}
+    recommendations = [WineResponse.model_validate(wines_by_id[i]) for i in wine_ids if i in wines_by_id]
+    return {"recommendations": recommendations, "total_recommendations": len(recommendations)}
+
+@router.post("/recommendations/batch")
+def get_batch_recommendations(request: BatchRecommendationRequest, db: Session = Depends(get_db)):
+    """여러 와인의 추천을 한 번에 조회 (점수 계산 한 번, DB 조회 한 번)"""
+    model = recommendation_model.current()
+    if model is None:
+        recommendation_model.reload_in_background(id_provider=get_all_wine_ids)
+        raise HTTPException(status_code=503, detail="추천 모델이 아직 로드되지 않았습니다. 잠시 후 다시 시도해주세요")
+    require_current_data(db, model)
+    
+    # 입력 순서를 유지하면서 중복 제거
+    wine_ids = list(dict.fromkeys(request.wine_ids))
+    mode = request.mode if model.has_ann else "exact"
+    recommended = model.recommend_batch(wine_ids, request.top_k, mode, request.n_probe)
+    
+    # 입력 와인과 추천 와인 전체를 한 번의 쿼리로 조회
+    needed_ids = set(wine_ids)
+    for recommended_ids in recommended.values():
+        needed_ids.update(recommended_ids or [])
+    wines_by_id = {w.id: w for w in db.query(Wine).filter(Wine.id.in_(needed_ids)).all()}
+    
+    results = {}
+    for wine_id in wine_ids:
+        if wine_id not in wines_by_id:
+            results[str(wine_id)] = {"error": "와인을 찾을 수 없습니다"}
+        elif recommended[wine_id] is None:
+            results[str(wine_id)] = {"error": "추천 모델에 없는 와인입니다"}
+        else:
+            recommendations = [
+                WineResponse.model_validate(wines_by_id[i]) for i in recommended[wine_id] if i in wines_by_id
+            ]
+            results[str(wine_id)] = {
+                "recommendations": recommendations,
+                "total_recommendations": len(recommendations),
+            }
+    
+    return {"top_k": request.top_k, "mode": mode, "results": results}
+
 @router.get("/{wine_id}", response_model=WineResponse)
 def get_wine(wine_id: int, db: Session = Depends(get_db)):
     """특정 와인 조회"""
@@ -0,0 +1,254 @@
+"""
+/wines 조회 API의 비동기 버전 (DB_BACKEND=async)
+DB를 기다리는 동안 이벤트 루프가 다른 요청을 처리하므로 FastAPI 기본 스레드 풀(40개) 크기에 묶이지 않음.
+추천 점수 계산(NumPy)은 SCORING_WORKERS 크기의 전용 실행기에서 실행해 이벤트 루프를 막지 않음.
+여기 없는 경로(전문 검색, 패싯, 배치 추천 등)는 동기 라우터(api/wines.py)가 그대로 처리하며,
+응답 형식과 파라미터는 동기 버전과 같음
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import Literal, Optional
+
+from database.async_db import get_async_db
+from database.setup import (
+    get_all_wine_ids, get_wine_key_hashes, get_neighbor_table_info, get_data_version, current_wine_statistics, wine_stats_response,
+    Wine, WineNeighbor, WineStats,
+)
+from database.lookup import DEFAULT_MATCH_MODE
+from database.catalog import wine_catalog
+from models.recommendation_model import recommendation_model
+from models.vectorizer import normalize_query, extract_query_filters
+from api.coalesce import request_coalescer
+from api.wines import (
+    WinePage, WineResponse, MatchMode, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PAGE_ORDER, MISSING_ATTRIBUTES_DETAIL,
+    keyset_condition, make_wine_page, wine_search_conditions, catalog_page_response, build_filters,
+    ordered_wine_list, stale_model_error, filter_catalog,
+)
+
+# 동기 라우터와 같은 경로를 덮어쓰므로 API 문서에는 동기 버전만 표시
+router = APIRouter(prefix="/wines", tags=["wines"], include_in_schema=False)
+
+# 추천 점수 계산 스레드 수 (NumPy 행렬 연산은 GIL을 놓으므로 코어 수만큼 병렬로 계산)
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS") or os.cpu_count() or 1)
+scoring_executor = ThreadPoolExecutor(max_workers=SCORING_WORKERS, thread_name_prefix="scoring")
+
+async def run_scoring(fn, *args):
+    """점수 계산 함수를 전용 실행기에서 실행"""
+    return await asyncio.get_running_loop().run_in_executor(scoring_executor, partial(fn, *args))
+
+async def require_model(db: AsyncSession, wine_id: Optional[int] = None):
+    """현재 모델 (로드 전이면 백그라운드 로드를 시작하고 503, wine_id가 없는 와인이면 먼저 404,
+    현재 데이터와 wine_id 대응이 어긋난 모델이면 409)"""
+    model = recommendation_model.current()
+    if model is None:
+        if wine_id is not None and await db.scalar(select(Wine.id).where(Wine.id == wine_id)) is None:
+            raise HTTPException(status_code=404, detail="와인을 찾을 수 없습니다")
+        recommendation_model.reload_in_background(id_provider=get_all_wine_ids)
+        raise HTTPException(status_code=503, detail="추천 모델이 아직 로드되지 않았습니다. 잠시 후 다시 시도해주세요")
+    
+    # api.wines.require_current_data와 같은 검사 (카탈로그를 읽는 검사는 데이터 버전마다 한 번, 스레드 풀에서)
+    data_version = await db.run_sync(lambda session: get_data_version(session.connection()))
+    check = model.cached_data_check(data_version)
+    if check is None:
+        check = await run_in_threadpool(model.check_data, data_version, get_wine_key_hashes)
+    if check["stale"]:
+        raise stale_model_error(model, check)
+    return model
+
+async def catalog_page(db: AsyncSession, filters: dict, limit: int, cursor: Optional[str]):
+    """카탈로그 검색 모드 페이지 (카탈로그 로드는 DB를 동기로 읽으므로 스레드 풀에서)"""
+    data_version = await db.run_sync(lambda session: get_data_version(session.connection()))
+    catalog = await run_in_threadpool(wine_catalog.get, data_version)
+    return catalog_page_response(catalog, data_version, filters, limit, cursor)
+
+async def paginate_wines(db: AsyncSession, conditions: list, limit: int, cursor: Optional[str]) -> WinePage:
+    """api.wines.paginate_wines의 비동기 버전"""
+    statement = select(Wine).where(*conditions)
+    if cursor is not None:
+        statement = statement.where(keyset_condition(cursor))
+    wines = (await db.scalars(statement.order_by(*PAGE_ORDER).limit(limit + 1))).all()
+    return make_wine_page(wines, limit)
+
+async def wine_list_response(db: AsyncSession, wine_ids, filters: Optional[dict] = None) -> dict:
+    """추천된 와인들의 상세 정보 (유사도 순서 유지)"""
+    wines = (await db.scalars(select(Wine).where(Wine.id.in_(wine_ids)))).all()
+    return ordered_wine_list(wines, wine_ids, filters)
+
+async def current_filter_catalog(db: AsyncSession, model, filters: dict):
+    """api.wines.filter_catalog의 비동기 버전 (카탈로그 로드는 DB를 동기로 읽으므로 스레드 풀에서)"""
+    if not filters:
+        return None
+    data_version = await db.run_sync(lambda session: get_data_version(session.connection()))
+    return await run_in_threadpool(filter_catalog, data_version, model, filters)
+
+@router.get("/", response_model=WinePage)
+async def get_all_wines(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """모든 와인 목록 조회 (점수 높은 순)"""
+    if wine_catalog.serving:
+        return await catalog_page(db, {}, limit, cursor)
+    return await paginate_wines(db, [], limit, cursor)
+
+@router.get("/search/", response_model=WinePage)
+async def search_wines(
+    country: Optional[str] = None,
+    variety: Optional[str] = None,
+    winery: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_points: Optional[int] = None,
+    max_points: Optional[int] = None,
+    match: MatchMode = DEFAULT_MATCH_MODE,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """와인 검색 (점수 높은 순)"""
+    if wine_catalog.serving:
+        filters = build_filters(country, variety, winery, min_price, max_price, min_points, max_points, match)
+        return await catalog_page(db, filters, limit, cursor)
+    conditions = wine_search_conditions(country, variety, winery, min_price, max_price, min_points, max_points, match)
+    return await paginate_wines(db, conditions, limit, cursor)
+
+@router.get("/stats/")
+async def get_wine_stats(db: AsyncSession = Depends(get_async_db)):
+    """와인 통계 정보 (미리 계산해 둔 wine_stats 한 행을 조회, 없으면 이 응답용으로만 계산)"""
+    
+    async def compute():
+        row = await db.get(WineStats, 1)
+        if row is None:
+            return await db.run_sync(lambda session: current_wine_statistics(session.connection()))
+        return wine_stats_response(row)
+    
+    return await request_coalescer.run_async(("stats",), compute)
+
+@router.get("/recommendations/query")
+async def get_query_recommendations(
+    q: str = Query(..., min_length=1, max_length=500),
+    top_k: int = 10,
+    mode: Literal["exact", "approx"] = "exact",
+    n_probe: Optional[int] = None,
+    country: Optional[str] = None,
+    variety: Optional[str] = None,
+    winery: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_points: Optional[int] = None,
+    max_points: Optional[int] = None,
+    match: MatchMode = DEFAULT_MATCH_MODE,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """자유 텍스트 취향 설명과 가까운 와인 목록"""
+    model = await require_model(db)
+    if not model.has_vectorizer:
+        raise HTTPException(
+            status_code=409,
+            detail="현재 모델 버전에는 벡터라이저가 없습니다. src/build_model.py로 모델을 다시 빌드해주세요",
+        )
+    
+    normalized = normalize_query(q)
+    filters = build_filters(country, variety, winery, min_price, max_price, min_points, max_points, match)
+    if filters and not model.has_attributes:
+        raise HTTPException(status_code=409, detail=MISSING_ATTRIBUTES_DETAIL)
+    if model.has_attributes:
+        filters = {**extract_query_filters(normalized), **filters}
+    if mode == "approx" and not model.has_ann:
+        mode = "exact"
+    
+    async def compute():
+        catalog = await current_filter_catalog(db, model, filters)
+        recommended_wine_ids, _ = await run_scoring(
+            model.recommend_for_query, normalized, top_k, mode, n_probe, filters, catalog
+        )
+        return {
+            "query": q,
+            "mode": mode,
+            "filters": filters,
+            **await wine_list_response(db, recommended_wine_ids, filters),
+        }
+    
+    key = ("query_recommendations", model.version, q, top_k, mode, n_probe, tuple(sorted(filters.items())))
+    return await request_coalescer.run_async(key, compute)
+
+@router.get("/{wine_id}/recommendations/")
+async def get_recommendations(
+    wine_id: int,
+    top_k: int = 10,
+    mode: Literal["exact", "approx"] = "exact",
+    n_probe: Optional[int] = None,
+    country: Optional[str] = None,
+    variety: Optional[str] = None,
+    winery: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_points: Optional[int] = None,
+    max_points: Optional[int] = None,
+    match: MatchMode = DEFAULT_MATCH_MODE,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """특정 와인에 대한 추천 와인 목록"""
+    model = await require_model(db, wine_id)
+    if mode == "approx" and not model.has_ann:
+        mode = "exact"
+    
+    filters = build_filters(country, variety, winery, min_price, max_price, min_points, max_points, match)
+    if filters and not model.has_attributes:
+        raise HTTPException(status_code=409, detail=MISSING_ATTRIBUTES_DETAIL)
+    
+    key = ("recommendations", model.version, wine_id, top_k, mode, n_probe, tuple(sorted(filters.items())))
+    return await request_coalescer.run_async(
+        key, lambda: recommend_for_wine(db, model, wine_id, top_k, mode, n_probe, filters)
+    )
+
+async def recommend_for_wine(db: AsyncSession, model, wine_id: int, top_k: int, mode: str,
+                             n_probe: Optional[int], filters: dict) -> dict:
+    """api.wines.recommend_for_wine의 비동기 버전 (점수 계산은 scoring_executor에서)"""
+    if await db.scalar(select(Wine.id).where(Wine.id == wine_id)) is None:
+        raise HTTPException(status_code=404, detail="와인을 찾을 수 없습니다")
+    
+    neighbor_info = await db.run_sync(get_neighbor_table_info)
+    if (not filters and neighbor_info is not None and neighbor_info["model_version"] == model.version
+            and top_k <= neighbor_info["k"]
+            and neighbor_info["data_version"] == await db.run_sync(lambda session: get_data_version(session.connection()))):
+        recommended_wines = (await db.scalars(
+            select(Wine)
+            .join(WineNeighbor, WineNeighbor.neighbor_id == Wine.id)
+            .where(WineNeighbor.wine_id == wine_id, WineNeighbor.rank < top_k)
+            .order_by(WineNeighbor.rank)
+        )).all()
+        if len(recommended_wines) == top_k:
+            recommendations = [WineResponse.model_validate(w) for w in recommended_wines]
+            return {
+                "wine_id": wine_id,
+                "mode": "precomputed",
+                "filters": filters,
+                "recommendations": recommendations,
+                "total_recommendations": len(recommendations)
+            }
+    
+    catalog = await current_filter_catalog(db, model, filters)
+    recommended_wine_ids = await run_scoring(model.recommend, wine_id, top_k, mode, n_probe, filters, catalog)
+    return {
+        "wine_id": wine_id,
+        "mode": mode,
+        "filters": filters,
+        **await wine_list_response(db, recommended_wine_ids, filters),
+    }
+
+@router.get("/{wine_id}", response_model=WineResponse)
+async def get_wine(wine_id: int, db: AsyncSession = Depends(get_async_db)):
+    """특정 와인 조회"""
+    wine = await db.get(Wine, wine_id)
+    if wine is None:
+        raise HTTPException(status_code=404, detail="와인을 찾을 수 없습니다")
+    return wine
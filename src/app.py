@@ -1,37 +1,61 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import text
+import asyncio
+import anyio.to_thread
+import threading
 import uvicorn
 import os
 import sys
 import time
-import sqlite3
 
 # 프로젝트 루트를 Python 경로에 추가
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from api.wines import router as wines_router
-from database.setup import get_db
-from models.recommendation_model import recommendation_model
+from api.admin import router as admin_router
+from database.setup import SessionLocal, get_all_wine_ids, get_data_version, engine, THREADPOOL_SIZE
+from models.recommendation_model import recommendation_model, ModelWatcher, MODEL_WATCH_INTERVAL
+from database.catalog import wine_catalog
+from database.async_db import DB_BACKEND, dispose_async_engine
+from api.cache import ResponseCacheMiddleware, response_cache
 
 app = FastAPI(title="와인 추천 API", description="와인 추천 시스템 API")
 
-# API 라우터 등록
+# API 라우터 등록 (DB_BACKEND=async이면 비동기 조회 핸들러를 먼저 등록해 같은 경로의 동기 핸들러보다 우선)
+if DB_BACKEND == "async":
+    from api.wines_async import router as wines_async_router
+    app.include_router(wines_async_router)
 app.include_router(wines_router)
+app.include_router(admin_router)
+
+# 조회 API 응답 캐시 (데이터/모델 버전이 바뀌면 무효화, ETag 재검증)
+app.add_middleware(ResponseCacheMiddleware, cache=response_cache)
+
+# 서버 종료 시 설정 (백그라운드 시작 작업의 대기를 중단)
+shutdown_requested = threading.Event()
+
+def database_file_missing() -> bool:
+    """SQLite 파일 DB인데 DATABASE_URL이 가리키는 파일이 아직 없는지 (다른 DB나 메모리 DB는 False)"""
+    database = engine.url.database
+    return engine.dialect.name == "sqlite" and database not in (None, "", ":memory:") and not os.path.exists(database)
 
 def wait_for_database(max_retries=30, retry_interval=2):
-    """데이터베이스가 준비될 때까지 기다림"""
+    """데이터베이스가 준비될 때까지 기다림 (백그라운드 스레드에서 실행)"""
     print("데이터베이스 준비 상태를 확인합니다...")
     
     for attempt in range(max_retries):
         try:
-            # 데이터베이스 파일 존재 확인
-            db_path = os.path.join(os.getcwd(), "wine_recommendation.db")
-            if not os.path.exists(db_path):
-                print(f"데이터베이스 파일을 찾을 수 없습니다. 재시도 {attempt + 1}/{max_retries}")
-                time.sleep(retry_interval)
+            # SQLite 파일 존재 확인 (DATABASE_URL의 경로, 연결하면 빈 파일이 생기므로 먼저 확인)
+            if database_file_missing():
+                print(f"데이터베이스 파일을 찾을 수 없습니다({engine.url.database}). 재시도 {attempt + 1}/{max_retries}")
+                if shutdown_requested.wait(retry_interval):
+                    return False
                 continue
             
             # 데이터베이스 연결 및 데이터 확인
-            db = next(get_db())
+            db = SessionLocal()
             from database.setup import Wine
             wine_count = db.query(Wine).count()
             db.close()
@@ -41,30 +65,112 @@ def wait_for_database(max_retries=30, retry_interval=2):
                 return True
             else:
                 print(f"데이터베이스에 데이터가 없습니다. 재시도 {attempt + 1}/{max_retries}")
-                time.sleep(retry_interval)
+                if shutdown_requested.wait(retry_interval):
+                    return False
                 
         except Exception as e:
             print(f"데이터베이스 연결 실패 (시도 {attempt + 1}/{max_retries}): {e}")
-            time.sleep(retry_interval)
+            if shutdown_requested.wait(retry_interval):
+                return False
     
     print("데이터베이스 준비 시간 초과. init-db 서비스가 완료되었는지 확인해주세요.")
     return False
 
+class StartupProgress:
+    """서버 시작 단계(database, model, catalog)별 상태와 소요 시간"""
+    
+    def __init__(self):
+        self.phases = {}
+    
+    def run(self, name: str, fn) -> bool:
+        """단계 하나를 실행하고 결과와 소요 시간을 기록/출력 (fn이 참을 반환하면 ready)"""
+        phase = self.phases[name] = {"state": "running", "seconds": None}
+        started = time.perf_counter()
+        try:
+            ok = bool(fn())
+        except Exception as e:
+            ok = False
+            phase["error"] = str(e)
+        phase["state"] = "ready" if ok else "failed"
+        phase["seconds"] = round(time.perf_counter() - started, 3)
+        print(f"[시작 단계] {name}: {phase['state']} ({phase['seconds']:.2f}초)")
+        return ok
+    
+    def get(self, name: str) -> dict:
+        return dict(self.phases.get(name, {"state": "pending", "seconds": None}))
+
+startup_progress = StartupProgress()
+startup_task = None
+
 @app.on_event("startup")
 async def startup_event():
-    """서버 시작 시 데이터베이스 연결 확인 및 모델 로드"""
-    if not wait_for_database():
-        print("경고: 데이터베이스가 준비되지 않았습니다. API는 제한적으로 작동할 수 있습니다.")
+    """서버 시작 (DB 대기와 모델 로드는 백그라운드 작업으로 진행하므로 바로 요청을 받음, 준비 상태는 /ready)"""
+    global startup_task
+    # 동기 핸들러용 스레드 풀 크기 (DB 연결 풀 크기의 기준)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    startup_task = asyncio.create_task(run_startup_phases())
+    
+    # 새 모델 버전이 배포되면 백그라운드에서 교체
+    if MODEL_WATCH_INTERVAL > 0:
+        model_watcher.start()
+        print(f"모델 디렉토리 감시 시작 ({MODEL_WATCH_INTERVAL}초 주기)")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """진행 중인 시작 작업의 DB 대기를 중단하고 비동기 DB 연결을 닫음"""
+    shutdown_requested.set()
+    if startup_task is not None and not startup_task.done():
+        startup_task.cancel()
+    await dispose_async_engine()
+
+async def run_startup_phases():
+    """DB 대기 → 모델 로드 → (카탈로그 모드면) 카탈로그 로드를 스레드 풀에서 차례로 실행
     
-    # 추천 모델 로드 시도
+    모델 로드는 커버리지 검사에 DB의 와인 ID가 필요하므로 DB 대기가 끝난 뒤 시작함
+    """
+    started = time.perf_counter()
+    if not await run_in_threadpool(startup_progress.run, "database", wait_for_database):
+        print("경고: 데이터베이스가 준비되지 않았습니다. API는 제한적으로 작동할 수 있습니다.")
+    if shutdown_requested.is_set():
+        return
+    await run_in_threadpool(startup_progress.run, "model", load_model_at_startup)
+    if wine_catalog.serving:
+        await run_in_threadpool(startup_progress.run, "catalog", preload_catalog)
+    print(f"서버 시작 작업 완료 ({time.perf_counter() - started:.2f}초)")
+
+def load_model_at_startup() -> bool:
+    """추천 모델 로드 시도"""
     print("추천 모델을 로드합니다...")
-    if recommendation_model.is_model_available():
-        if recommendation_model.load_model():
-            print("추천 모델 로드 완료!")
-        else:
-            print("경고: 추천 모델 로드에 실패했습니다.")
-    else:
-        print("경고: 추천 모델 파일을 찾을 수 없습니다. models/ 디렉토리에 모델 파일을 추가해주세요.")
+    if not recommendation_model.is_model_available():
+        print(f"경고: 추천 모델 아티팩트를 찾을 수 없습니다. {recommendation_model.model_dir} 디렉토리에 모델 아티팩트를 추가해주세요.")
+        return False
+    result = recommendation_model.reload(expected_ids=get_all_wine_ids_or_none())
+    if result["state"] == "loaded":
+        print(f"추천 모델 로드 완료! (버전 {result['version']})")
+        return True
+    print(f"경고: 추천 모델 로드에 실패했습니다. {result.get('error')}")
+    return False
+
+def preload_catalog() -> bool:
+    """카탈로그 검색 모드면 첫 요청 전에 카탈로그를 읽어 둠 (이후 데이터 버전이 바뀌면 요청 시 다시 읽음)"""
+    try:
+        with engine.connect() as conn:
+            catalog = wine_catalog.get(get_data_version(conn), wait=True)
+        print(f"검색 카탈로그 로드 완료! ({catalog.size}개 와인, {catalog.nbytes / 2**20:.1f}MB)")
+        return True
+    except Exception as e:
+        print(f"경고: 검색 카탈로그 로드에 실패했습니다. 첫 검색 요청 때 다시 시도합니다. {e}")
+        return False
+
+def get_all_wine_ids_or_none():
+    """모델 커버리지 검사용 카탈로그 ID (DB가 준비되지 않았으면 None)"""
+    try:
+        return get_all_wine_ids()
+    except Exception as e:
+        print(f"카탈로그 ID 조회 실패, 커버리지 검사를 생략합니다: {e}")
+        return None
+
+model_watcher = ModelWatcher(recommendation_model, MODEL_WATCH_INTERVAL, id_provider=get_all_wine_ids)
 
 @app.get("/")
 def read_root():
@@ -73,8 +179,42 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    """헬스체크 API"""
+    """헬스체크 API (프로세스 생존 여부만 확인, 준비 상태는 /ready)"""
     return {"status": "healthy", "message": "API 서버가 정상적으로 작동 중입니다."}
 
+@app.get("/ready")
+def readiness_check():
+    """준비 상태 확인 (DB, 추천 모델, 카탈로그 모드면 카탈로그를 따로 보고, 모두 준비되면 200, 아니면 503)
+    
+    추천 모델은 모델 아티팩트가 있을 때만 필요 (아티팩트가 없으면 추천 API만 503이고 나머지 API는 준비 상태)
+    """
+    database = startup_progress.get("database")
+    database["ready"] = False
+    # 시작 단계가 끝난 뒤에는 현재 DB 상태를 직접 확인 (시작 후 DB가 준비/유실된 경우 반영)
+    if database["state"] in ("ready", "failed"):
+        try:
+            with engine.connect() as conn:
+                database["ready"] = conn.execute(text("SELECT 1 FROM wines LIMIT 1")).first() is not None
+        except Exception as e:
+            database["error"] = str(e)
+    
+    # 시작 시 로드에 실패했어도 이후 감시/관리자 API로 로드되면 준비 상태
+    model = startup_progress.get("model")
+    active = recommendation_model.current()
+    model["ready"] = active is not None
+    model["required"] = active is not None or recommendation_model.is_model_available()
+    model["version"] = active.version if active is not None else None
+    
+    ready = database["ready"] and (model["ready"] or not model["required"])
+    content = {"status": "not_ready", "database": database, "model": model}
+    if wine_catalog.serving:
+        # 목록/검색을 카탈로그로 응답하므로 카탈로그를 읽기 전에는 준비되지 않은 상태
+        catalog = startup_progress.get("catalog")
+        catalog["ready"] = wine_catalog.loaded
+        ready = ready and catalog["ready"]
+        content["catalog"] = catalog
+    content["status"] = "ready" if ready else "not_ready"
+    return JSONResponse(status_code=200 if ready else 503, content=content)
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
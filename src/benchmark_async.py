@@ -0,0 +1,126 @@
+"""
+DB 접근 방식 처리량 벤치마크
+DB_BACKEND=sync / async로 API 서버(uvicorn)를 차례로 띄우고, 동시 연결 수를 바꿔 가며
+와인 조회/검색/추천 요청의 초당 처리량과 지연 시간(p50, p99)을 비교
+응답 캐시는 끄고(RESPONSE_CACHE_ENTRIES=0), 요청마다 다른 와인 ID를 써서 동일 요청 병합이 일어나지 않게 함
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from dotenv import load_dotenv
+from database.setup import get_all_wine_ids
+
+# .env 파일 로드
+load_dotenv()
+
+SEARCH_COUNTRIES = ["US", "France", "Italy", "Spain", "Portugal", "Chile", "Argentina", "Austria"]
+
+# 시나리오 이름 → 요청 경로 생성 함수
+SCENARIOS = {
+    "wine": lambda ids: f"/wines/{random.choice(ids)}",
+    "search": lambda ids: f"/wines/search/?country={random.choice(SEARCH_COUNTRIES)}&min_points=90&limit=20",
+    "recommend": lambda ids: f"/wines/{random.choice(ids)}/recommendations/?top_k=10",
+}
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="DB 접근 방식(sync / async) 처리량 비교")
+    parser.add_argument("--backends", default="sync,async", help="비교할 DB_BACKEND 목록 (쉼표 구분)")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="실행할 시나리오 (wine, search, recommend)")
+    parser.add_argument("--concurrency", default="16,64,256", help="동시 연결 수 목록 (쉼표 구분)")
+    parser.add_argument("--duration", type=float, default=5.0, help="조합별 측정 시간(초)")
+    parser.add_argument("--port", type=int, default=8765, help="벤치마크용 서버 포트")
+    return parser.parse_args(argv)
+
+def start_server(backend, port):
+    """DB_BACKEND를 지정해 API 서버를 띄우고 /ready가 200이 될 때까지 기다림"""
+    env = {**os.environ, "DB_BACKEND": backend, "RESPONSE_CACHE_ENTRIES": "0"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+         "--port", str(port), "--log-level", "warning", "--no-access-log"],
+        env=env, stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"서버가 종료되었습니다 (exit {server.returncode})")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/ready", timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("서버가 120초 안에 준비되지 않았습니다")
+
+async def fetch(reader, writer, path):
+    """keep-alive 연결로 GET 요청 한 번 (상태 코드 반환)"""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    headers = dict(line.lower().split(": ", 1) for line in lines[1:] if ": " in line)
+    await reader.readexactly(int(headers.get("content-length", 0)))
+    return int(lines[0].split()[1])
+
+async def client(port, make_path, ids, deadline, latencies, errors):
+    """연결 하나로 deadline까지 요청을 반복"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            status = await fetch(reader, writer, make_path(ids))
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+async def run_load(port, make_path, ids, concurrency, duration):
+    """동시 연결 concurrency개로 duration초 동안 요청 (처리량, p50/p99 ms, 오류 수)"""
+    latencies, errors = [], []
+    started = time.monotonic()
+    await asyncio.gather(*[
+        client(port, make_path, ids, started + duration, latencies, errors) for _ in range(concurrency)
+    ])
+    elapsed = time.monotonic() - started
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0] * 99
+    return len(latencies) / elapsed, quantiles[49] * 1000, quantiles[98] * 1000, len(errors)
+
+def main():
+    args = parse_args()
+    backends = args.backends.split(",")
+    scenarios = args.scenarios.split(",")
+    levels = [int(value) for value in args.concurrency.split(",")]
+    ids = get_all_wine_ids().tolist()
+    
+    print("=== DB 접근 방식 처리량 벤치마크 ===")
+    print(f"와인 {len(ids)}개, 조합별 {args.duration:.0f}초, 응답 캐시 끔\n")
+    print(f"{'방식':<8}{'시나리오':<12}{'동시 연결':>10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'오류':>6}")
+    
+    for backend in backends:
+        server = start_server(backend, args.port)
+        try:
+            for scenario in scenarios:
+                make_path = SCENARIOS[scenario]
+                # 첫 요청(연결 풀, 페이지 캐시 준비)은 측정에서 제외
+                asyncio.run(run_load(args.port, make_path, ids, 4, 1.0))
+                for concurrency in levels:
+                    throughput, p50, p99, errors = asyncio.run(
+                        run_load(args.port, make_path, ids, concurrency, args.duration)
+                    )
+                    print(f"{backend:<8}{scenario:<12}{concurrency:>10}{throughput:>10.0f}{p50:>10.1f}{p99:>10.1f}{errors:>6}")
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+검색 응답 방식 벤치마크
+같은 검색 조건을 ORM 경로(SQLAlchemy 조회 + WineResponse 변환)와 메모리 내 카탈로그 경로로
+응답 JSON까지 만들어 지연 시간을 비교하고, 두 경로의 결과가 같은지 확인
+"""
+
+import argparse
+import json
+import statistics
+import time
+from dotenv import load_dotenv
+from database.setup import SessionLocal, get_data_version
+from database.catalog import wine_catalog
+from database.lookup import DEFAULT_MATCH_MODE
+from api.wines import search_wines, DEFAULT_PAGE_SIZE
+
+# .env 파일 로드
+load_dotenv()
+
+# (이름, 검색 조건)
+SCENARIOS = [
+    ("전체", {}),
+    ("국가", {"country": "US"}),
+    ("국가+품종+점수", {"country": "France", "variety": "Pinot Noir", "min_points": 90}),
+    ("가격+점수 범위", {"max_price": 20, "min_points": 92}),
+    ("와이너리 부분 일치", {"winery": "chateau", "match": "substring"}),
+]
+SEARCH_PARAMS = ("country", "variety", "winery", "min_price", "max_price", "min_points", "max_points")
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="검색 응답 방식(ORM / 카탈로그) 지연 시간 비교")
+    parser.add_argument("--repeat", type=int, default=20, help="조건별 반복 횟수")
+    parser.add_argument("--limit", type=int, default=DEFAULT_PAGE_SIZE, help="페이지 크기")
+    parser.add_argument("--pages", type=int, default=5, help="커서로 따라가며 읽을 페이지 수")
+    return parser.parse_args(argv)
+
+def fetch_pages(db, params, limit, pages, serving):
+    """검색 조건으로 pages개 페이지를 커서로 따라가며 응답 JSON(bytes) 목록 반환"""
+    wine_catalog.serving = serving
+    bodies, cursor = [], None
+    for _ in range(pages):
+        response = search_wines(
+            **{name: params.get(name) for name in SEARCH_PARAMS},
+            match=params.get("match", DEFAULT_MATCH_MODE), limit=limit, cursor=cursor, db=db,
+        )
+        # ORM 경로는 FastAPI가 응답 모델을 JSON으로 직렬화하는 단계까지 포함
+        body = response.body if serving else response.model_dump_json().encode()
+        bodies.append(body)
+        cursor = response_cursor(response, serving)
+        if cursor is None:
+            break
+    return bodies
+
+def response_cursor(response, serving):
+    """응답의 next_cursor (카탈로그 경로는 이미 JSON으로 만든 응답)"""
+    if serving:
+        return json.loads(response.body)["next_cursor"]
+    return response.next_cursor
+
+def normalize_bodies(bodies):
+    """두 경로의 JSON 직렬화 차이(공백 등)를 없앤 비교용 값"""
+    return [json.loads(body) for body in bodies]
+
+def measure(db, params, limit, pages, serving, repeat):
+    """반복 실행한 지연 시간(ms) 목록과 마지막 응답"""
+    timings, bodies = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        bodies = fetch_pages(db, params, limit, pages, serving)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, bodies
+
+def main():
+    args = parse_args()
+    print("=== 검색 응답 방식 벤치마크 ===")
+    serving = wine_catalog.serving
+    db = SessionLocal()
+    try:
+        wine_catalog.serving = True
+        started = time.perf_counter()
+        catalog = wine_catalog.get(get_data_version(db.connection()), wait=True)
+        print(f"카탈로그 로드: {time.perf_counter() - started:.2f}초, {catalog.size}개 와인, "
+              f"{catalog.nbytes / 2**20:.1f}MB (데이터 버전 {catalog.data_version})")
+        print(f"페이지 크기 {args.limit}, 요청당 최대 {args.pages}페이지, 반복 {args.repeat}회 (중앙값 ms)\n")
+        print(f"{'조건':<20}{'ORM':>10}{'카탈로그':>10}{'배율':>8}  결과")
+        
+        for name, params in SCENARIOS:
+            # 첫 실행(마스크 계산, DB 캐시)은 측정에서 제외
+            fetch_pages(db, params, args.limit, args.pages, False)
+            fetch_pages(db, params, args.limit, args.pages, True)
+            orm_timings, orm_bodies = measure(db, params, args.limit, args.pages, False, args.repeat)
+            catalog_timings, catalog_bodies = measure(db, params, args.limit, args.pages, True, args.repeat)
+            orm_ms = statistics.median(orm_timings)
+            catalog_ms = statistics.median(catalog_timings)
+            same = "동일" if normalize_bodies(orm_bodies) == normalize_bodies(catalog_bodies) else "불일치"
+            print(f"{name:<20}{orm_ms:>10.2f}{catalog_ms:>10.2f}{orm_ms / catalog_ms:>7.1f}x  {same}")
+    finally:
+        wine_catalog.serving = serving
+        db.close()
+
+if __name__ == "__main__":
+    main()
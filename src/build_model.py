@@ -0,0 +1,228 @@
+"""
+추천 모델 빌드 스크립트
+wines 테이블을 배치로 스트리밍해 특성 행렬과 어휘를 만들고 모델 아티팩트(새 버전)로 저장
+
+단계:
+1. 통계 수집: 설명 토큰화(프로세스 병렬) → 문서 빈도, 범주 빈도, 점수/가격 분포
+2. 어휘 구성: 상위 어휘와 IDF, 랜덤 투영 행렬, 상위 범주 확정
+3. 특성 행렬: 배치별 TF-IDF 투영 + 원-핫 + 스케일 값 (프로세스 병렬), 필터용 속성 수집
+4. 아티팩트 저장: features/wine_ids/어휘/속성 파일 + 매니페스트, LATEST 갱신 (선택: 양자화 행렬, IVF 인덱스)
+5. (선택) 사전 계산 이웃 테이블 갱신
+"""
+
+import os
+import time
+import argparse
+import resource
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from dotenv import load_dotenv
+from database.setup import (
+    engine, create_tables, iter_wine_batches, store_wine_neighbors, format_rate, get_data_version, hash_source_keys,
+)
+from models.recommendation_model import (
+    DEFAULT_MODEL_DIR, ATTRIBUTE_STRING_COLUMNS, ATTRIBUTE_NUMERIC_COLUMNS, QUANTIZED_DTYPES, WineAttributes,
+    save_artifact, load_artifact, write_manifest, ann_recall,
+)
+from models.vectorizer import (
+    CATEGORY_COLUMNS, VectorizerStatistics, count_document_frequencies,
+    init_transform_worker, transform_in_worker,
+)
+
+# .env 파일 로드
+load_dotenv()
+
+FEATURE_COLUMNS = ("description",) + CATEGORY_COLUMNS + ("points", "price")
+# 특성 행렬과 함께 저장하는 필터용 속성 열
+ATTRIBUTE_COLUMNS = ATTRIBUTE_STRING_COLUMNS + ATTRIBUTE_NUMERIC_COLUMNS
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="wines 테이블로 추천 모델 아티팩트 빌드")
+    parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR, help="모델 아티팩트 디렉토리")
+    parser.add_argument("--version", default=None, help="새 버전 이름 (기본: v날짜-시각)")
+    parser.add_argument("--batch-size", type=int, default=10000, help="DB에서 한 번에 읽는 와인 수")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("BUILD_WORKERS") or os.cpu_count() or 1),
+        help="토큰화/변환에 사용할 프로세스 수 (1이면 현재 프로세스에서 처리)",
+    )
+    parser.add_argument("--max-features", type=int, default=20000, help="TF-IDF 어휘 최대 크기")
+    parser.add_argument("--min-df", type=int, default=2, help="어휘에 포함할 최소 문서 빈도")
+    parser.add_argument("--text-dim", type=int, default=96, help="설명 TF-IDF를 투영할 차원 수")
+    parser.add_argument("--top-categories", type=int, default=10, help="품종/국가/지역별 원-핫 범주 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--storage", choices=("float32",) + QUANTIZED_DTYPES, default="float32",
+                        help="점수 계산용 특성 행렬 형식 (int8은 행별 스케일 사용)")
+    parser.add_argument("--drop-float32", action="store_true",
+                        help="양자화 저장 시 float32 행렬을 저장하지 않음 (재정렬 불가)")
+    parser.add_argument("--ann-lists", type=int, default=None,
+                        help="지정하면 IVF 인덱스도 생성 (0이면 목록 수 기본값)")
+    parser.add_argument("--neighbors", type=int, default=0,
+                        help="지정하면 와인별 top-K 이웃 테이블도 갱신")
+    return parser.parse_args(argv)
+
+def memory_usage_mb():
+    """(현재 RSS, 최대 RSS, 워커 프로세스 최대 RSS) MB"""
+    current = None
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        pass
+    # Linux의 ru_maxrss 단위는 KB
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return current, peak, children
+
+class StageTimer:
+    """단계별 소요 시간과 메모리 사용량 기록/출력"""
+    
+    def __init__(self):
+        self.stages = []
+    
+    def run(self, name, func, *args, **kwargs):
+        print(f"\n[{name}]")
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        current, peak, children = memory_usage_mb()
+        current_text = f"{current:.0f}MB" if current is not None else "-"
+        print(f"  완료: {elapsed:.2f}초, RSS {current_text} (최대 {peak:.0f}MB, 워커 최대 {children:.0f}MB)")
+        self.stages.append({
+            "stage": name,
+            "seconds": round(elapsed, 3),
+            "rss_mb": round(current, 1) if current is not None else None,
+            "peak_rss_mb": round(peak, 1),
+            "worker_peak_rss_mb": round(children, 1),
+        })
+        return result
+
+def map_batches(func, batches, workers, initializer=None, initargs=()):
+    """(배치, func(배치)) 쌍을 원래 순서대로 반환 (workers가 2 이상이면 프로세스 풀에서 실행)
+    
+    제출 후 결과를 기다리는 배치 수를 workers * 2로 제한하므로 메모리는 배치 크기에 비례한다.
+    """
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for batch in batches:
+            yield batch, func(batch)
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append((batch, executor.submit(func, batch)))
+            if len(pending) >= workers * 2:
+                done_batch, future = pending.popleft()
+                yield done_batch, future.result()
+        while pending:
+            done_batch, future = pending.popleft()
+            yield done_batch, future.result()
+
+def _count_frame_terms(frame):
+    """배치 설명의 문서 빈도 (워커 프로세스에서 실행)"""
+    return count_document_frequencies(frame["description"])
+
+def collect_statistics(batch_size, workers):
+    """1차 패스: 토큰 문서 빈도와 범주/수치 통계 누적"""
+    stats = VectorizerStatistics()
+    started = time.perf_counter()
+    batches = iter_wine_batches(FEATURE_COLUMNS, batch_size)
+    for frame, doc_freq in map_batches(_count_frame_terms, batches, workers):
+        stats.update(frame, doc_freq)
+        print(f"  {stats.n_docs}개 와인 토큰화 ({format_rate(stats.n_docs, time.perf_counter() - started)})")
+    print(f"  고유 단어 {len(stats.doc_freq)}개")
+    return stats
+
+def build_feature_matrix(vectorizer, batch_size, workers):
+    """2차 패스: 배치별 특성 블록을 만들어 (wine_ids, features, 필터용 속성, source_key 해시)로 합침"""
+    id_blocks, feature_blocks, key_hash_blocks = [], [], []
+    attribute_columns = {column: [] for column in ATTRIBUTE_COLUMNS}
+    rows = 0
+    started = time.perf_counter()
+    columns = tuple(dict.fromkeys(FEATURE_COLUMNS + ATTRIBUTE_COLUMNS + ("source_key",)))
+    batches = iter_wine_batches(columns, batch_size)
+    for frame, features in map_batches(transform_in_worker, batches, workers,
+                                       init_transform_worker, (vectorizer,)):
+        id_blocks.append(frame["id"].to_numpy(dtype=np.int64))
+        key_hash_blocks.append(hash_source_keys(frame["source_key"]))
+        feature_blocks.append(features)
+        for column, values in attribute_columns.items():
+            values.extend(frame[column].tolist())
+        rows += len(frame)
+        print(f"  {rows}개 와인 변환 ({format_rate(rows, time.perf_counter() - started)})")
+    attributes = WineAttributes.from_columns(attribute_columns)
+    if not feature_blocks:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, np.empty((0, vectorizer.dim), dtype=np.float32), attributes, empty.astype(np.uint64)
+    return np.concatenate(id_blocks), np.vstack(feature_blocks), attributes, np.concatenate(key_hash_blocks)
+
+def main():
+    args = parse_args()
+    print("=== 추천 모델 빌드 ===")
+    print(f"워커 프로세스: {args.workers}개, 배치 크기: {args.batch_size}")
+    
+    create_tables()
+    timer = StageTimer()
+    
+    stats = timer.run("1. 통계 수집", collect_statistics, args.batch_size, args.workers)
+    if stats.n_docs == 0:
+        print("wines 테이블이 비어 있습니다. 먼저 python src/init_db.py로 데이터를 적재해주세요.")
+        return
+    
+    vectorizer = timer.run(
+        "2. 어휘 구성", stats.build_vectorizer,
+        args.max_features, args.min_df, args.text_dim, args.top_categories, args.seed,
+    )
+    del stats
+    print(f"  어휘 {len(vectorizer.terms)}개, 특성 {vectorizer.dim}차원 "
+          f"(텍스트 {vectorizer.text_dim} + 범주 {vectorizer.dim - vectorizer.text_dim - len(vectorizer.numeric)}"
+          f" + 수치 {len(vectorizer.numeric)})")
+    
+    # 특성 행렬을 읽기 전의 데이터 버전 (읽는 중에 적재가 끝나면 서버가 버전 차이로 wine_id 대응을 다시 검사)
+    with engine.connect() as conn:
+        data_version = get_data_version(conn)
+    wine_ids, features, attributes, key_hashes = timer.run(
+        "3. 특성 행렬 생성", build_feature_matrix, vectorizer, args.batch_size, args.workers,
+    )
+    
+    artifact_dir = timer.run(
+        "4. 아티팩트 저장", save_artifact, args.model_dir, wine_ids, features, args.version,
+        {"build": {"source": "wines", "workers": args.workers, "batch_size": args.batch_size}},
+        args.ann_lists, None, vectorizer, attributes, args.storage, not args.drop_float32,
+        key_hashes, data_version,
+    )
+    del features
+    print(f"  저장 위치: {artifact_dir}")
+    
+    manifest, index = load_artifact(artifact_dir)
+    storage = index.storage_info()
+    print(f"  저장 형식: {storage['dtype']}, 와인당 {storage['bytes_per_wine']}바이트")
+    if "storage" in manifest:
+        recall = manifest["storage"]["recall_at_10"]
+        print(f"  양자화 recall@10 (표본 200개): 재정렬 전 {recall['quantized']:.3f}, 재정렬 후 {recall['reranked']:.3f} "
+              f"(재정렬 배수 {recall.get('rerank_factor', '-')})")
+    if index.ann is not None:
+        print(f"  IVF recall@10 (표본 200개): {ann_recall(index):.3f}")
+    
+    if args.neighbors > 0:
+        timer.run(
+            "5. 이웃 테이블 갱신", store_wine_neighbors,
+            index.iter_all_top_k(args.neighbors), args.neighbors, manifest["version"], data_version,
+        )
+    
+    # 단계별 시간/메모리는 모든 단계(아티팩트 저장, 이웃 테이블 포함)가 끝난 뒤 매니페스트에 기록
+    manifest["build"]["stages"] = timer.stages
+    write_manifest(artifact_dir, manifest)
+    
+    print("\n=== 빌드 완료 ===")
+    print(f"모델 버전: {manifest['version']} ({index.size}개 와인 × {index.dim}차원, 데이터 버전 {data_version})")
+    print(f"총 소요 시간: {sum(stage['seconds'] for stage in timer.stages):.2f}초")
+    print("실행 중인 서버는 POST /admin/model/reload로 새 버전을 적용할 수 있습니다.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+와인별 유사 와인 사전 계산 스크립트
+현재 추천 모델로 모든 와인의 top-K 이웃을 계산해 wine_neighbors 테이블에 저장
+"""
+
+import argparse
+import time
+from dotenv import load_dotenv
+from database.setup import engine, create_tables, store_wine_neighbors, format_rate, get_data_version, get_wine_key_hashes
+from models.recommendation_model import WineRecommendationModel
+
+# .env 파일 로드
+load_dotenv()
+
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="와인별 top-K 유사 와인 사전 계산")
+    parser.add_argument("--k", type=int, default=20, help="와인별로 저장할 이웃 수")
+    parser.add_argument("--batch-size", type=int, default=128, help="한 번에 점수를 계산할 와인 수 (메모리 ≈ 배치 × 와인 수 × 12바이트)")
+    parser.add_argument("--version", default=None, help="사용할 모델 버전 (기본: LATEST)")
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    print("=== 유사 와인 사전 계산 ===")
+    
+    create_tables()
+    
+    model = WineRecommendationModel(version=args.version)
+    if not model.load_model():
+        print("추천 모델을 로드할 수 없습니다. 모델 아티팩트를 먼저 생성해주세요.")
+        return
+    loaded = model.current()
+    print(f"모델 버전: {loaded.version} ({loaded.index.size}개 와인)")
+    
+    # 이웃 wine_id는 현재 데이터 버전에서 모델과 대응이 맞을 때만 유효
+    with engine.connect() as conn:
+        data_version = get_data_version(conn)
+    check = loaded.check_data(data_version, get_wine_key_hashes)
+    if check["stale"]:
+        print(f"모델의 wine_id {check['mismatched_ids']}개가 데이터 버전 {data_version}의 와인과 맞지 않습니다. "
+              "python src/build_model.py로 모델을 먼저 다시 빌드해주세요.")
+        return
+    
+    started = time.perf_counter()
+    
+    def progress(stored_wines):
+        elapsed = time.perf_counter() - started
+        print(f"  {stored_wines}/{loaded.index.size}개 와인 처리 ({format_rate(stored_wines, elapsed)})")
+    
+    blocks = loaded.index.iter_all_top_k(args.k, args.batch_size)
+    stored = store_wine_neighbors(blocks, args.k, loaded.version, data_version, progress)
+    
+    elapsed = time.perf_counter() - started
+    print(f"\n저장 완료: {stored}개 와인 × {args.k}개 이웃 (데이터 버전 {data_version}), {elapsed:.2f}초")
+
+if __name__ == "__main__":
+    main()
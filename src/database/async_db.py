@@ -0,0 +1,58 @@
+"""
+비동기 데이터베이스 접근 (SQLAlchemy AsyncSession)
+DB_BACKEND=async이면 /wines 조회 API를 async 핸들러로 처리 (api/wines_async.py)
+SQLite는 aiosqlite 드라이버를 사용하며, 스키마/적재/관리 작업은 그대로 동기 엔진(database/setup.py)을 사용
+"""
+
+import os
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database.setup import DATABASE_URL
+
+# 조회 API의 DB 접근 방식 (sync: 스레드 풀의 동기 세션, async: 이벤트 루프의 AsyncSession)
+DB_BACKEND = os.getenv("DB_BACKEND", "sync")
+# 비동기 엔진 커넥션 풀 크기 (동시에 DB를 기다릴 수 있는 요청 수, 초과분은 커넥션 반환을 기다림)
+ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE") or 20)
+
+# 동기 드라이버 → 비동기 드라이버
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL의 드라이버를 비동기 드라이버로 바꾼 URL (이미 드라이버를 지정했으면 그대로)"""
+    scheme, sep, rest = url.partition("://")
+    return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+_async_engine = None
+_session_factory = None
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """비동기 세션 팩토리 (DB_BACKEND=sync이면 aiosqlite를 불러오지 않도록 처음 사용할 때 엔진 생성)"""
+    global _async_engine, _session_factory
+    if _session_factory is None:
+        # aiosqlite 기본값은 요청마다 연결을 새로 여는 NullPool이므로 연결을 재사용하도록 풀을 지정
+        async_engine = create_async_engine(
+            async_database_url(DATABASE_URL), poolclass=AsyncAdaptedQueuePool,
+            pool_size=ASYNC_DB_POOL_SIZE, max_overflow=0,
+        )
+        if async_engine.dialect.name == "sqlite":
+            from database.setup import set_sqlite_pragma
+            event.listen(async_engine.sync_engine, "connect", set_sqlite_pragma)
+        _async_engine = async_engine
+        _session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    return _session_factory
+
+async def dispose_async_engine():
+    """비동기 엔진의 풀 연결 닫기 (aiosqlite 연결마다 있는 작업 스레드 종료, 서버 종료 시 호출)"""
+    global _async_engine, _session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _session_factory = None
+
+async def get_async_db():
+    """비동기 데이터베이스 세션 반환"""
+    async with get_async_sessionmaker()() as db:
+        yield db
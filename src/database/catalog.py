@@ -0,0 +1,338 @@
+"""
+메모리 내 와인 카탈로그 (패싯 개수 계산, 선택적으로 검색 응답까지)
+국가/품종/와이너리는 사전 인코딩된 코드 배열, 가격/점수는 NumPy 배열로 보관해
+필터는 벡터화된 마스크로, 패싯별 와인 수는 코드 배열의 bincount로 계산
+SEARCH_BACKEND=catalog이면 응답에 필요한 나머지 열(텍스트는 UTF-8 버퍼 + 오프셋)도 읽어
+/wines/와 /wines/search/를 ORM 없이 응답
+app_meta의 데이터 버전이 바뀌면 백그라운드에서 DB를 다시 읽고, 다 읽을 때까지는 이전 카탈로그로 응답
+"""
+
+import os
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+
+import numpy as np
+
+from database.setup import engine, iter_wine_batches, get_data_version
+from models.recommendation_model import ATTRIBUTE_STRING_COLUMNS, ATTRIBUTE_NUMERIC_COLUMNS, WineAttributes
+
+# 검색 응답 방식 (orm: SQLAlchemy 조회, catalog: 메모리 내 카탈로그)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "orm")
+
+CATALOG_COLUMNS = ATTRIBUTE_STRING_COLUMNS + ATTRIBUTE_NUMERIC_COLUMNS
+# 검색 응답용 추가 열: 긴 텍스트는 문자열 버퍼, 나머지 문자열은 사전 인코딩
+ROW_TEXT_COLUMNS = ("title", "description")
+ROW_DICTIONARY_COLUMNS = ("province", "region", "designation", "taster_name", "taster_twitter_handle")
+CATALOG_BATCH_SIZE = 20000
+
+# 가격/점수 구간 경계 (구간은 하한 이상 상한 미만)
+PRICE_BUCKET_EDGES = (10, 20, 30, 50, 100, 200)
+POINTS_BAND_EDGES = (80, 85, 90, 95)
+# 패싯별로 자기 자신의 조건은 빼고 개수를 셈 (선택한 국가 외의 다른 국가 개수도 보이도록)
+FACET_FILTER_KEYS = {
+    "country": ("country",),
+    "variety": ("variety",),
+    "price": ("min_price", "max_price"),
+    "points": ("min_points", "max_points"),
+}
+DEFAULT_FACET_LIMIT = 20
+# 필터가 있는 검색 페이지를 찾을 때 정렬 순서대로 처음 검사하는 행 수 (부족하면 두 배씩 늘림)
+PAGE_SCAN_ROWS = 4096
+
+def range_buckets(edges, integer=False):
+    """구간 경계 → 구간 목록 ({label, min, max}, 양 끝 구간은 한쪽이 열림)"""
+    buckets = [{"label": f"<{edges[0]}", "min": None, "max": edges[0]}]
+    for low, high in zip(edges, edges[1:]):
+        buckets.append({"label": f"{low}-{high - 1 if integer else high}", "min": low, "max": high})
+    buckets.append({"label": f"{edges[-1]}+", "min": edges[-1], "max": None})
+    return buckets
+
+PRICE_BUCKETS = range_buckets(PRICE_BUCKET_EDGES) + [{"label": "unknown", "min": None, "max": None}]
+POINTS_BANDS = range_buckets(POINTS_BAND_EDGES, integer=True)
+
+def column_values(frame, column):
+    """DataFrame 열 → 값 목록 (결측은 None)"""
+    series = frame[column]
+    return series.astype(object).where(series.notna(), None).tolist()
+
+class StringArena:
+    """문자열 열을 UTF-8 바이트 버퍼 하나와 행별 오프셋 배열로 보관 (행마다 파이썬 문자열을 두지 않음)"""
+    
+    def __init__(self, data: bytes, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+    
+    @classmethod
+    def from_values(cls, values) -> "StringArena":
+        encoded = [("" if value is None else value).encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return cls(b"".join(encoded), offsets)
+    
+    def get(self, row: int) -> str:
+        return self.data[self.offsets[row]:self.offsets[row + 1]].decode("utf-8")
+    
+    @property
+    def nbytes(self) -> int:
+        return len(self.data) + self.offsets.nbytes
+
+class DictionaryColumn:
+    """저카디널리티 문자열 열 (고유값 목록 + 행별 코드, None은 코드 -1)"""
+    
+    def __init__(self, codes: np.ndarray, values: list):
+        self.codes = codes
+        self.values = values
+    
+    @classmethod
+    def from_values(cls, values) -> "DictionaryColumn":
+        index = {}
+        codes = np.fromiter(
+            (-1 if value is None else index.setdefault(value, len(index)) for value in values),
+            dtype=np.int32,
+            count=len(values),
+        )
+        return cls(codes, list(index))
+    
+    def get(self, row: int):
+        code = self.codes[row]
+        return None if code < 0 else self.values[code]
+    
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + sum(len(value) for value in self.values)
+
+class CatalogRows:
+    """검색 응답 행을 만드는 데 필요한 나머지 열과 (points DESC, id DESC) 정렬 순서"""
+    
+    def __init__(self, wine_ids: np.ndarray, points: np.ndarray, price: np.ndarray,
+                 texts: dict, dictionaries: dict):
+        self.points = points
+        self.price = price
+        self.texts = texts
+        self.dictionaries = dictionaries
+        # 정렬 키 = points × 2^32 + id (내림차순 정렬 순서와 키셋 위치 탐색용 오름차순 -키)
+        keys = (points.astype(np.int64) << 32) | wine_ids
+        self.order = np.argsort(-keys, kind="stable")
+        self.sorted_negated_keys = -keys[self.order]
+    
+    @property
+    def nbytes(self) -> int:
+        columns = list(self.texts.values()) + list(self.dictionaries.values())
+        arrays = (self.points, self.price, self.order, self.sorted_negated_keys)
+        return sum(column.nbytes for column in columns) + sum(array.nbytes for array in arrays)
+
+class WineCatalog:
+    """한 데이터 버전의 와인 열 (읽기 전용, 교체 방식으로 갱신)"""
+    
+    def __init__(self, wine_ids: np.ndarray, attributes: WineAttributes, data_version: int,
+                 rows: CatalogRows = None):
+        self.wine_ids = wine_ids
+        self.attributes = attributes
+        self.data_version = data_version
+        self.rows = rows
+        self.loaded_at = datetime.now().isoformat(timespec="seconds")
+        
+        # 가격 구간 코드 (가격이 없으면 마지막 "unknown" 구간)
+        price = attributes.numeric["price"]
+        price_codes = np.digitize(price, PRICE_BUCKET_EDGES).astype(np.int8)
+        price_codes[np.isnan(price)] = len(PRICE_BUCKETS) - 1
+        self.price_codes = price_codes
+        self.points_codes = np.digitize(attributes.numeric["points"], POINTS_BAND_EDGES).astype(np.int8)
+    
+    @property
+    def size(self) -> int:
+        return len(self.wine_ids)
+    
+    @classmethod
+    def load(cls, include_rows: bool = False, batch_size: int = CATALOG_BATCH_SIZE) -> "WineCatalog":
+        """wines 테이블 전체를 배치로 읽어 생성 (include_rows면 검색 응답용 열까지)"""
+        # 버전을 먼저 읽으므로 읽는 도중 적재가 끝나면 다음 확인 때 다시 읽게 됨
+        with engine.connect() as conn:
+            data_version = get_data_version(conn)
+        string_columns = ATTRIBUTE_STRING_COLUMNS
+        if include_rows:
+            string_columns += ROW_TEXT_COLUMNS + ROW_DICTIONARY_COLUMNS
+        id_blocks = []
+        numeric_blocks = {column: [] for column in ATTRIBUTE_NUMERIC_COLUMNS}
+        strings = {column: [] for column in string_columns}
+        for frame in iter_wine_batches(string_columns + ATTRIBUTE_NUMERIC_COLUMNS, batch_size):
+            id_blocks.append(frame["id"].to_numpy(dtype=np.int64))
+            for column in ATTRIBUTE_NUMERIC_COLUMNS:
+                numeric_blocks[column].append(frame[column].to_numpy(dtype=np.float64, na_value=np.nan))
+            for column in string_columns:
+                strings[column].extend(column_values(frame, column))
+        
+        def concatenate(blocks, dtype):
+            return np.concatenate(blocks) if blocks else np.empty(0, dtype=dtype)
+        
+        wine_ids = concatenate(id_blocks, np.int64)
+        numeric = {column: concatenate(blocks, np.float64) for column, blocks in numeric_blocks.items()}
+        attributes = WineAttributes.from_columns({
+            **{column: strings[column] for column in ATTRIBUTE_STRING_COLUMNS},
+            **numeric,
+        })
+        rows = None
+        if include_rows:
+            rows = CatalogRows(
+                wine_ids,
+                np.nan_to_num(numeric["points"]).astype(np.int32),
+                numeric["price"],
+                {column: StringArena.from_values(strings.pop(column)) for column in ROW_TEXT_COLUMNS},
+                {column: DictionaryColumn.from_values(strings.pop(column)) for column in ROW_DICTIONARY_COLUMNS},
+            )
+        return cls(wine_ids, attributes, data_version, rows)
+    
+    @property
+    def nbytes(self) -> int:
+        """카탈로그 배열과 문자열 버퍼의 대략적인 메모리 크기"""
+        attributes = self.attributes
+        arrays = [self.wine_ids, self.price_codes, self.points_codes]
+        arrays += list(attributes.codes.values()) + list(attributes.numeric.values())
+        total = sum(array.nbytes for array in arrays)
+        total += sum(len(value) for values in attributes.values.values() for value in values)
+        return total + (self.rows.nbytes if self.rows is not None else 0)
+    
+    def mask(self, filters: dict):
+        """필터 조건 → 행 마스크 (조건이 없으면 None)"""
+        return self.attributes.mask(filters)
+    
+    def count(self, filters: dict) -> int:
+        mask = self.mask(filters)
+        return self.size if mask is None else int(np.count_nonzero(mask))
+    
+    def _bincount(self, codes: np.ndarray, filters: dict, n_values: int) -> np.ndarray:
+        mask = self.mask(filters)
+        selected = codes if mask is None else codes[mask]
+        return np.bincount(selected, minlength=n_values)
+    
+    def facets(self, filters: dict, limit: int = DEFAULT_FACET_LIMIT) -> dict:
+        """필터 조건에서의 패싯별 와인 수 (국가/품종은 상위 limit개, 가격/점수는 전체 구간)"""
+        facets = {}
+        for facet, own_keys in FACET_FILTER_KEYS.items():
+            other_filters = {key: value for key, value in filters.items() if key not in own_keys}
+            if facet in ATTRIBUTE_STRING_COLUMNS:
+                values = self.attributes.values[facet]
+                counts = self._bincount(self.attributes.codes[facet], other_filters, len(values))
+                top = np.argsort(-counts, kind="stable")[:limit]
+                facets[facet] = [
+                    {"value": values[code], "count": int(counts[code])} for code in top if counts[code] > 0
+                ]
+            else:
+                codes, buckets = (
+                    (self.price_codes, PRICE_BUCKETS) if facet == "price" else (self.points_codes, POINTS_BANDS)
+                )
+                counts = self._bincount(codes, other_filters, len(buckets))
+                facets[facet] = [{**bucket, "count": int(count)} for bucket, count in zip(buckets, counts)]
+        return facets
+    
+    def search_page(self, filters: dict, limit: int, after=None):
+        """(points DESC, id DESC) 순서에서 after=(points, id) 다음부터 필터를 만족하는 limit개 행
+        
+        반환: (응답 행 dict 목록, 다음 페이지가 있으면 마지막 행의 (points, id) 아니면 None)
+        정렬 순서는 미리 계산해 두었으므로 커서 위치는 이진 탐색으로 찾고, 필터 마스크는 그 뒤쪽만 검사한다.
+        """
+        rows = self.rows
+        start = 0
+        if after is not None:
+            points, wine_id = after
+            start = int(np.searchsorted(rows.sorted_negated_keys, -((points << 32) | wine_id), side="right"))
+        
+        mask = self.mask(filters)
+        wanted = limit + 1
+        if mask is None:
+            positions = rows.order[start:start + wanted]
+        else:
+            found, count, scan = [], 0, PAGE_SCAN_ROWS
+            while start < self.size and count < wanted:
+                candidates = rows.order[start:start + scan]
+                hits = candidates[mask[candidates]]
+                found.append(hits)
+                count += len(hits)
+                start += scan
+                scan *= 2
+            positions = np.concatenate(found)[:wanted] if found else np.empty(0, dtype=np.int64)
+        
+        page = [self.row(int(position)) for position in positions[:limit]]
+        last_key = (page[-1]["points"], page[-1]["id"]) if len(positions) > limit else None
+        return page, last_key
+    
+    def row(self, position: int) -> dict:
+        """한 행의 응답 dict (WineResponse와 같은 필드)"""
+        rows, attributes = self.rows, self.attributes
+        price = rows.price[position]
+        return {
+            "id": int(self.wine_ids[position]),
+            "title": rows.texts["title"].get(position),
+            "country": attributes.values["country"][attributes.codes["country"][position]],
+            "province": rows.dictionaries["province"].get(position),
+            "region": rows.dictionaries["region"].get(position),
+            "winery": attributes.values["winery"][attributes.codes["winery"][position]],
+            "variety": attributes.values["variety"][attributes.codes["variety"][position]],
+            "designation": rows.dictionaries["designation"].get(position),
+            "points": int(rows.points[position]),
+            "price": None if np.isnan(price) else float(price),
+            "description": rows.texts["description"].get(position),
+            "taster_name": rows.dictionaries["taster_name"].get(position),
+            "taster_twitter_handle": rows.dictionaries["taster_twitter_handle"].get(position),
+        }
+
+class CatalogHolder:
+    """현재 카탈로그 보관 (요청 시 데이터 버전을 확인해 바뀌었으면 백그라운드에서 다시 읽고 참조를 교체)"""
+    
+    def __init__(self, serving: bool = False):
+        # serving이면 검색 응답용 열까지 읽고 /wines/, /wines/search/를 카탈로그로 응답
+        self.serving = serving
+        self._catalog = None
+        self._lock = threading.Lock()
+        # 진행 중이거나 마지막으로 끝난 다시 읽기 (Future, 결과는 읽은 카탈로그)
+        self._refresh = None
+    
+    @property
+    def loaded(self) -> bool:
+        """카탈로그를 한 번이라도 읽었는지 (이후 데이터 버전이 바뀌면 요청 시 다시 읽음)"""
+        return self._catalog is not None
+    
+    def get(self, data_version: int, wait: bool = False) -> WineCatalog:
+        """data_version의 카탈로그
+        
+        다르면 한 스레드가 백그라운드에서 다시 읽어 끝나면 참조를 바꾸고, 그동안 요청은 이전 카탈로그를 그대로 받는다
+        (반환한 카탈로그의 data_version으로 확인 가능). 처음이라 쓸 수 있는 카탈로그가 없거나 wait=True이면
+        다시 읽기가 끝날 때까지 기다린다 (동시에 온 요청은 같은 읽기를 기다림).
+        """
+        catalog = self._catalog
+        if self._is_current(catalog, data_version):
+            return catalog
+        refresh = self._start_refresh()
+        if self._is_usable(catalog) and not wait:
+            return catalog
+        return refresh.result()
+    
+    def _start_refresh(self) -> Future:
+        """진행 중인 다시 읽기가 없으면 시작 (진행 중이면 그 Future 반환)"""
+        with self._lock:
+            if self._refresh is None or self._refresh.done():
+                refresh = Future()
+                threading.Thread(
+                    target=self._run_refresh, args=(refresh,), name="catalog-refresh", daemon=True
+                ).start()
+                self._refresh = refresh
+            return self._refresh
+    
+    def _run_refresh(self, refresh: Future):
+        try:
+            catalog = WineCatalog.load(include_rows=self.serving)
+        except Exception as e:
+            refresh.set_exception(e)
+            return
+        self._catalog = catalog
+        refresh.set_result(catalog)
+    
+    def _is_usable(self, catalog) -> bool:
+        return catalog is not None and (catalog.rows is not None or not self.serving)
+    
+    def _is_current(self, catalog, data_version) -> bool:
+        return self._is_usable(catalog) and catalog.data_version == data_version
+
+# 전역 카탈로그
+wine_catalog = CatalogHolder(serving=SEARCH_BACKEND == "catalog")
@@ -0,0 +1,34 @@
+"""
+국가/품종/와이너리 조회 규칙
+wines 테이블의 *_norm 컬럼(적재 시 채움)과 추천 필터(모델 속성 마스크)가 같은 정규화와 일치 방식을 사용
+"""
+
+import unicodedata
+
+# 정규화 컬럼을 두는 조회용 문자열 컬럼 (DB 컬럼 이름은 f"{컬럼}_norm")
+LOOKUP_COLUMNS = ("country", "variety", "winery")
+# exact/prefix는 인덱스를 사용하고, substring은 전체 스캔이므로 명시적으로 요청할 때만 사용
+MATCH_MODES = ("exact", "prefix", "substring")
+DEFAULT_MATCH_MODE = "prefix"
+
+def normalize_lookup_value(value) -> str:
+    """소문자화(casefold), 악센트 제거, 공백 정리한 조회용 값 (None은 빈 문자열)"""
+    if value is None:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(value))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+def prefix_upper_bound(prefix: str) -> str:
+    """prefix로 시작하는 모든 문자열보다 큰 가장 작은 문자열 (범위 조건 prefix <= x < bound 용)"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def matches_lookup(normalized_value: str, needle: str, match: str = DEFAULT_MATCH_MODE) -> bool:
+    """정규화된 값이 (정규화된) 검색어와 일치하는지 확인"""
+    if match == "exact":
+        return normalized_value == needle
+    if match == "prefix":
+        return normalized_value.startswith(needle)
+    if match == "substring":
+        return needle in normalized_value
+    raise ValueError(f"지원하지 않는 일치 방식입니다: {match}")
@@ -0,0 +1,98 @@
+"""
+백그라운드 데이터 재적재 작업
+API 서버를 내리지 않고 섀도 테이블 재구축(또는 증분 적재)을 실행하고 진행 상황을 보고
+"""
+
+import threading
+import time
+from datetime import datetime
+
+from database.setup import DEFAULT_CHUNK_SIZE, reload_dataset
+
+
+class ReloadJob:
+    """한 번에 하나만 실행되는 데이터 재적재 작업"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self.state = "idle"
+        self.dataset = None
+        self.incremental = False
+        self.phase = None
+        self.rows = 0
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self.result = None
+        self._started_clock = None
+        self._elapsed = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self.state == "running"
+
+    def start(self, dataset: str, chunk_size: int = DEFAULT_CHUNK_SIZE, incremental: bool = False) -> bool:
+        """재적재를 백그라운드 스레드로 시작 (이미 실행 중이면 False)"""
+        with self._lock:
+            if self.is_running:
+                return False
+            self.state = "running"
+            self.dataset = dataset
+            self.incremental = incremental
+            self.phase = "starting"
+            self.rows = 0
+            self.started_at = datetime.now()
+            self.finished_at = None
+            self.error = None
+            self.result = None
+            self._started_clock = time.perf_counter()
+            self._thread = threading.Thread(
+                target=self._run, args=(dataset, chunk_size, incremental), name="wine-reload", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def _progress(self, phase: str, rows: int):
+        self.phase = phase
+        self.rows = rows
+
+    def _run(self, dataset: str, chunk_size: int, incremental: bool):
+        try:
+            self.result = reload_dataset(dataset, chunk_size, incremental, self._progress)
+            self.state = "succeeded"
+        except Exception as e:
+            self.error = str(e)
+            self.state = "failed"
+        finally:
+            self.finished_at = datetime.now()
+            self._elapsed = time.perf_counter() - self._started_clock
+
+    def elapsed(self) -> float:
+        """경과 시간(초)"""
+        if self._started_clock is None:
+            return 0.0
+        if self.finished_at is not None:
+            return self._elapsed
+        return time.perf_counter() - self._started_clock
+
+    def status(self) -> dict:
+        """작업 상태, 진행 단계, 처리 행 수와 처리 속도"""
+        elapsed = self.elapsed()
+        return {
+            "state": self.state,
+            "dataset": self.dataset,
+            "incremental": self.incremental,
+            "phase": self.phase,
+            "rows": self.rows,
+            "elapsed_seconds": round(elapsed, 2),
+            "rows_per_sec": round(self.rows / elapsed, 1) if elapsed > 0 else 0.0,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+# 전역 재적재 작업 인스턴스
+reload_job = ReloadJob()
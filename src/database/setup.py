@@ -1,17 +1,60 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Text
+from sqlalchemy import (
+    create_engine, event, Column, Integer, String, Float, Text, MetaData, Table, Index,
+    insert, delete, update, select, bindparam, inspect, text, and_, func, case,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import pandas as pd
 import os
+import re
+import json
+import math
+import time
+import uuid
+import queue
+import threading
+import anyio
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from dotenv import load_dotenv
+from database.lookup import (
+    LOOKUP_COLUMNS, DEFAULT_MATCH_MODE, normalize_lookup_value, prefix_upper_bound,
+)
 
 # .env 파일 로드
 load_dotenv()
 
 # 데이터베이스 URL 설정 (환경 변수에서 읽기)
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./wine_recommendation.db")
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# FastAPI(AnyIO) 스레드 풀 크기 (동기 핸들러, 응답 검증, run_in_threadpool 작업이 나눠 씀, app.py가 시작할 때 적용)
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE") or 40)
+# 연결 풀 크기 (스레드 풀의 모든 스레드가 연결을 하나씩 가질 수 있도록 기본값은 스레드 풀 크기)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE") or THREADPOOL_SIZE)
+# 스레드 풀 밖에서 DB를 쓰는 백그라운드 스레드(시작 작업, 모델 교체, 적재)용 추가 연결 수
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW") or 10)
+# 연결을 기다리는 최대 시간 (초)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT") or 30)
+if DB_POOL_SIZE + DB_MAX_OVERFLOW < THREADPOOL_SIZE:
+    raise ValueError(
+        f"DB_POOL_SIZE + DB_MAX_OVERFLOW({DB_POOL_SIZE} + {DB_MAX_OVERFLOW})가 "
+        f"스레드 풀 크기 THREADPOOL_SIZE({THREADPOOL_SIZE})보다 작습니다"
+    )
+engine = create_engine(
+    DATABASE_URL, connect_args={"check_same_thread": False},
+    pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT,
+)
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        """WAL 모드: 적재 트랜잭션이 진행 중이어도 API 조회가 막히지 않도록 함"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+# 벌크 적재 시 한 번의 executemany로 보내는 행 수
+DEFAULT_CHUNK_SIZE = int(os.getenv("INGEST_CHUNK_SIZE") or 5000)
 
 # 세션 생성
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -36,6 +79,59 @@ class Wine(Base):
     description = Column(Text)
     taster_name = Column(String)
     taster_twitter_handle = Column(String)
+    # 증분 적재용: 원본 행의 고정 키와 정제된 내용의 해시
+    source_key = Column(String, unique=True, index=True)
+    content_hash = Column(String)
+    # 조회용 정규화 값 (소문자, 악센트 제거; 적재 시 채움, database.lookup 참고)
+    country_norm = Column(String)
+    variety_norm = Column(String)
+    winery_norm = Column(String, index=True)
+    
+    # 자주 쓰는 검색 조합용 복합 인덱스 (국가 단독 조회는 첫 번째 인덱스의 앞부분을 사용)
+    __table_args__ = (
+        Index("ix_wines_country_variety_points", "country_norm", "variety_norm", "points"),
+        Index("ix_wines_variety_price", "variety_norm", "price"),
+        Index("ix_wines_points_price", "points", "price"),
+        # 목록/검색 페이지 정렬 키 (points DESC, id DESC)의 키셋 페이지네이션용
+        Index("ix_wines_points_id", "points", "id"),
+    )
+
+# 와인별 사전 계산된 유사 와인 (rank 0이 가장 유사)
+class WineNeighbor(Base):
+    __tablename__ = "wine_neighbors"
+    
+    wine_id = Column(Integer, primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    neighbor_id = Column(Integer, nullable=False)
+    score = Column(Float, nullable=False)
+
+# 파생 데이터의 메타 정보 (키-값)
+class AppMeta(Base):
+    __tablename__ = "app_meta"
+    
+    key = Column(String, primary_key=True)
+    value = Column(String)
+
+# 적재가 끝날 때 미리 계산해 두는 와인 통계 (id=1 한 행, 통계 본문은 JSON)
+class WineStats(Base):
+    __tablename__ = "wine_stats"
+    
+    id = Column(Integer, primary_key=True)
+    data_version = Column(Integer, nullable=False)
+    refreshed_at = Column(String)
+    stats = Column(Text, nullable=False)
+
+# 전문 검색용 SQLite FTS5 테이블 (rowid = wines.id, 내용을 직접 보관)
+WINE_FTS_TABLE = "wines_fts"
+WINE_FTS_COLUMNS = ("title", "description", "winery", "variety", "designation")
+FTS_ENABLED = engine.dialect.name == "sqlite"
+# 조회 쿼리 작성용 정의 (생성은 create_wine_fts_table에서 CREATE VIRTUAL TABLE로)
+wine_fts = Table(
+    WINE_FTS_TABLE,
+    MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    *[Column(column, Text) for column in WINE_FTS_COLUMNS],
+)
 
 def safe_string_value(value, default="Unknown"):
     """문자열 값을 안전하게 처리"""
@@ -61,20 +157,286 @@ def safe_int_value(value, default=0):
     except (ValueError, TypeError):
         return default
 
+# 원본 컬럼 → Wine 컬럼 매핑 (데이터셋 타입별)
+WINE_COLUMN_MAP = {
+    "title": "title",
+    "country": "country",
+    "province": "province",
+    "region": "region_1",
+    "winery": "winery",
+    "variety": "variety",
+    "designation": "designation",
+    "points": "points",
+    "price": "price",
+    "description": "description",
+    "taster_name": "taster_name",
+    "taster_twitter_handle": "taster_twitter_handle",
+}
+DATASET_COLUMN_MAPS = {
+    "winemag": WINE_COLUMN_MAP,
+    "sample_csv": WINE_COLUMN_MAP,
+}
+
+# 문자열 컬럼의 기본값 (title은 행 번호 기반 기본값을 사용)
+STRING_DEFAULTS = {
+    "country": "Unknown",
+    "province": "Unknown",
+    "region": "Unknown",
+    "winery": "Unknown",
+    "variety": "Unknown",
+    "designation": "Unknown",
+    "description": "No description available",
+    "taster_name": "Unknown",
+    "taster_twitter_handle": "Unknown",
+}
+
+def clean_string_column(series, default="Unknown"):
+    """safe_string_value와 동일한 규칙으로 문자열 컬럼 전체를 정제"""
+    cleaned = series.astype(str).str.strip().astype(object)
+    missing = series.isna() | (cleaned == "")
+    return cleaned.mask(missing, default)
+
+def clean_int_column(series, default=0):
+    """safe_int_value와 동일한 규칙으로 정수 컬럼 전체를 정제"""
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        # 문자열이 섞인 컬럼은 int() 변환 규칙을 그대로 따름
+        return pd.Series([safe_int_value(value, default) for value in series], index=series.index, dtype=object)
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = np.isfinite(values)
+    result = np.full(len(values), default, dtype=object)
+    result[valid] = np.trunc(values[valid]).astype(np.int64)
+    return pd.Series(result, index=series.index, dtype=object)
+
+def clean_float_column(series, default=None):
+    """safe_float_value와 동일한 규칙으로 실수 컬럼 전체를 정제"""
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return pd.Series([safe_float_value(value, default) for value in series], index=series.index, dtype=object)
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    result = values.astype(object)
+    result[np.isnan(values)] = default
+    return pd.Series(result, index=series.index, dtype=object)
+
+def normalize_lookup_column(series):
+    """문자열 컬럼 → 조회용 정규화 값 (고유값마다 한 번만 계산)"""
+    normalized = {value: normalize_lookup_value(value) for value in pd.unique(series)}
+    return pd.Series([normalized[value] for value in series], index=series.index, dtype=object)
+
+def clean_wine_frame(df, dataset_type):
+    """원본 데이터프레임을 Wine 테이블 컬럼 구성의 데이터프레임으로 정제"""
+    column_map = DATASET_COLUMN_MAPS.get(dataset_type, WINE_COLUMN_MAP)
+    missing_column = pd.Series(None, index=df.index, dtype=object)
+    
+    def source(column):
+        source_column = column_map[column]
+        return df[source_column] if source_column in df.columns else missing_column
+    
+    cleaned = pd.DataFrame(index=df.index)
+    # 제목이 없으면 'Unknown Wine {행 번호}' 사용
+    title_defaults = pd.Series([f'Unknown Wine {index + 1}' for index in df.index], index=df.index, dtype=object)
+    cleaned["title"] = clean_string_column(source("title"), title_defaults)
+    for column, default in STRING_DEFAULTS.items():
+        cleaned[column] = clean_string_column(source(column), default)
+    cleaned["points"] = clean_int_column(source("points"), 0)
+    cleaned["price"] = clean_float_column(source("price"), None)
+    cleaned = cleaned[list(WINE_COLUMN_MAP)]
+    cleaned["source_key"] = build_source_keys(df, dataset_type)
+    cleaned["content_hash"] = build_content_hashes(cleaned)
+    for column in LOOKUP_COLUMNS:
+        cleaned[f"{column}_norm"] = normalize_lookup_column(cleaned[column])
+    return cleaned
+
+# 원본 CSV의 행 ID 컬럼 후보 (winemag 파일의 첫 번째 무명 컬럼 등)
+SOURCE_ID_COLUMNS = ("Unnamed: 0", "id")
+
+def build_source_keys(df, dataset_type):
+    """행마다 고정된 원본 키 생성 ('{데이터셋}:{행 ID}')"""
+    for column in SOURCE_ID_COLUMNS:
+        if column in df.columns and df[column].notna().all():
+            row_ids = df[column].astype(str).str.strip()
+            break
+    else:
+        # 행 ID 컬럼이 없으면 파일 내 행 위치를 키로 사용
+        row_ids = pd.Series(df.index, index=df.index).astype(str)
+    return (f"{dataset_type}:" + row_ids).astype(object)
+
+def build_content_hashes(wines):
+    """정제된 컬럼 값 전체에 대한 64비트 해시 (16자리 hex)"""
+    hashes = pd.util.hash_pandas_object(wines[list(WINE_COLUMN_MAP)], index=False).to_numpy()
+    return pd.Series([format(value, "016x") for value in hashes], index=wines.index, dtype=object)
+
+def insert_wine_records(conn, wines, chunk_size=DEFAULT_CHUNK_SIZE, table=None):
+    """정제된 데이터프레임을 chunk_size 단위 executemany로 INSERT"""
+    table = Wine.__table__ if table is None else table
+    statement = insert(table)
+    inserted = 0
+    for start in range(0, len(wines), chunk_size):
+        records = wines.iloc[start:start + chunk_size].to_dict("records")
+        if records:
+            conn.execute(statement, records)
+            inserted += len(records)
+    return inserted
+
+def format_rate(rows, elapsed):
+    """처리 속도 문자열 (rows/sec)"""
+    rate = rows / elapsed if elapsed > 0 else float(rows)
+    return f"{rate:,.0f} rows/sec"
+
 def create_tables():
     """데이터베이스 테이블 생성"""
     Base.metadata.create_all(bind=engine)
+    migrate_schema()
+    ensure_wine_fts()
+    ensure_wine_stats()
     print("데이터베이스 테이블이 생성되었습니다.")
 
+def migrate_schema():
+    """기존 DB에 없는 컬럼과 인덱스 추가 (create_all은 이미 있는 테이블을 변경하지 않음)"""
+    inspector = inspect(engine)
+    if not inspector.has_table(Wine.__tablename__):
+        return
+    existing_columns = {column["name"] for column in inspector.get_columns(Wine.__tablename__)}
+    
+    with engine.begin() as conn:
+        for column in Wine.__table__.columns:
+            if column.name not in existing_columns:
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {Wine.__tablename__} ADD COLUMN {column.name} {column_type}"))
+                print(f"컬럼 추가: {Wine.__tablename__}.{column.name}")
+        backfill_lookup_columns(conn)
+        # 섀도 테이블 교체 후에는 인덱스 이름이 달라지므로 컬럼 구성으로 비교
+        existing_indexes = {
+            tuple(index["column_names"]) for index in inspect(conn).get_indexes(Wine.__tablename__)
+        }
+        for index in Wine.__table__.indexes:
+            if tuple(column.name for column in index.columns) not in existing_indexes:
+                index.create(conn)
+
+def backfill_lookup_columns(conn, batch_size=DEFAULT_CHUNK_SIZE):
+    """정규화 컬럼이 비어 있는 기존 행을 채움 (정규화 컬럼 추가 전에 적재된 DB)"""
+    table = Wine.__table__
+    norm_columns = [table.c[f"{column}_norm"] for column in LOOKUP_COLUMNS]
+    rows = conn.execute(
+        select(table.c.id, *[table.c[column] for column in LOOKUP_COLUMNS]).where(norm_columns[0].is_(None))
+    ).all()
+    if not rows:
+        return
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .values({column.name: bindparam(f"b_{column.name}") for column in norm_columns})
+    )
+    for start in range(0, len(rows), batch_size):
+        conn.execute(statement, [
+            {"b_id": row[0], **{
+                f"b_{column}_norm": normalize_lookup_value(value)
+                for column, value in zip(LOOKUP_COLUMNS, row[1:])
+            }}
+            for row in rows[start:start + batch_size]
+        ])
+    print(f"정규화 컬럼 채움: {len(rows)}개 행")
+
+def lookup_condition(column, value, match=DEFAULT_MATCH_MODE):
+    """country/variety/winery 조건 → 정규화 컬럼에 대한 SQL 조건
+    
+    exact는 등호, prefix는 범위 조건(prefix <= x < 다음 문자열)이라 인덱스를 사용한다.
+    substring은 LIKE '%값%'이라 전체 스캔이 필요하다.
+    """
+    norm_column = Wine.__table__.c[f"{column}_norm"]
+    needle = normalize_lookup_value(value)
+    if match == "exact":
+        return norm_column == needle
+    if match == "prefix":
+        if not needle:
+            return norm_column.isnot(None)
+        return and_(norm_column >= needle, norm_column < prefix_upper_bound(needle))
+    if match == "substring":
+        escaped = needle.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return norm_column.like(f"%{escaped}%", escape="\\")
+    raise ValueError(f"지원하지 않는 일치 방식입니다: {match}")
+
+def create_wine_fts_table(conn, name=WINE_FTS_TABLE):
+    """FTS5 가상 테이블 생성 (악센트 무시 unicode61 토크나이저)"""
+    columns = ", ".join(WINE_FTS_COLUMNS)
+    conn.execute(text(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS "{name}" USING fts5({columns}, tokenize="unicode61 remove_diacritics 2")'
+    ))
+
+def populate_wine_fts(conn, name=WINE_FTS_TABLE, source=None, source_keys=None):
+    """source 테이블(기본: wines)의 행을 FTS 테이블에 추가 (source_keys를 주면 해당 행만)"""
+    source = source or Wine.__tablename__
+    columns = ", ".join(WINE_FTS_COLUMNS)
+    statement = f'INSERT INTO "{name}"(rowid, {columns}) SELECT id, {columns} FROM "{source}"'
+    if source_keys is None:
+        conn.execute(text(statement))
+        return
+    statement = text(f"{statement} WHERE source_key IN :keys").bindparams(bindparam("keys", expanding=True))
+    for start in range(0, len(source_keys), 500):
+        conn.execute(statement, {"keys": list(source_keys[start:start + 500])})
+
+def delete_wine_fts(conn, source_keys=None, legacy=False):
+    """source_key로 찾은 wines 행(legacy=True면 원본 키가 없는 행)의 FTS 행 삭제 (wines 행을 지우기 전에 호출)"""
+    statement = f'DELETE FROM "{WINE_FTS_TABLE}" WHERE rowid IN (SELECT id FROM "{Wine.__tablename__}" WHERE '
+    if legacy:
+        conn.execute(text(statement + "source_key IS NULL)"))
+        return
+    statement = text(statement + "source_key IN :keys)").bindparams(bindparam("keys", expanding=True))
+    for start in range(0, len(source_keys), 500):
+        conn.execute(statement, {"keys": list(source_keys[start:start + 500])})
+
+def ensure_wine_fts():
+    """FTS 테이블이 없으면 만들고, 비어 있으면 현재 wines 내용으로 채움 (기존 DB 마이그레이션)"""
+    if not FTS_ENABLED:
+        return
+    with engine.begin() as conn:
+        create_wine_fts_table(conn)
+        fts_empty = conn.execute(text(f'SELECT 1 FROM "{WINE_FTS_TABLE}" LIMIT 1')).first() is None
+        if fts_empty and conn.execute(select(Wine.id).limit(1)).first() is not None:
+            populate_wine_fts(conn)
+            print(f"전문 검색 색인 생성: {WINE_FTS_TABLE}")
+
+def rebuild_wine_fts():
+    """FTS 테이블을 현재 wines 내용으로 다시 채움"""
+    if not FTS_ENABLED:
+        return
+    with engine.begin() as conn:
+        create_wine_fts_table(conn)
+        conn.execute(text(f'DELETE FROM "{WINE_FTS_TABLE}"'))
+        populate_wine_fts(conn)
+
+# FTS 질의에 그대로 넘기면 문법 오류가 나는 문자를 피하기 위해 단어만 따옴표로 감쌈 (끝의 *는 접두어 검색)
+FTS_TERM_PATTERN = re.compile(r"(\w+)(\*?)")
+
+def build_fts_match_query(query):
+    """사용자 입력 → 모든 단어를 포함하는 FTS5 MATCH 식 (단어가 없으면 None)"""
+    terms = [f'"{word}"{star}' for word, star in FTS_TERM_PATTERN.findall(query or "")]
+    return " ".join(terms) if terms else None
+
+class NAStatistics:
+    """청크 단위로 누적하는 NA 값 통계"""
+    
+    def __init__(self):
+        self.na_counts = {}
+        self.total_count = 0
+    
+    def update(self, df):
+        """청크 하나의 NA 개수를 누적"""
+        for column, na_count in df.isna().sum().items():
+            self.na_counts[column] = self.na_counts.get(column, 0) + int(na_count)
+        self.total_count += len(df)
+    
+    def report(self):
+        """누적된 NA 값 분석 결과 출력"""
+        print("\n=== NA 값 분석 ===")
+        for column, na_count in self.na_counts.items():
+            na_percentage = (na_count / self.total_count) * 100 if self.total_count else 0.0
+            print(f"{column}: {na_count}/{self.total_count} ({na_percentage:.1f}%) NA 값")
+        print("==================\n")
+
 def analyze_na_values(df):
     """데이터프레임의 NA 값 분석"""
-    print("\n=== NA 값 분석 ===")
-    for column in df.columns:
-        na_count = df[column].isna().sum()
-        total_count = len(df)
-        na_percentage = (na_count / total_count) * 100
-        print(f"{column}: {na_count}/{total_count} ({na_percentage:.1f}%) NA 값")
-    print("==================\n")
+    na_stats = NAStatistics()
+    na_stats.update(df)
+    na_stats.report()
 
 def get_available_datasets():
     """사용 가능한 데이터셋 목록 반환"""
@@ -105,80 +467,390 @@ def load_data_from_file(file_path):
         print(f"파일 읽기 오류: {e}")
         return None
 
-def process_wine_data(df, dataset_type):
-    """와인 데이터 처리 및 저장"""
+def iter_csv_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """CSV 파일을 chunk_size 행 단위로 읽어 순서대로 반환 (전체 파일을 메모리에 올리지 않음)"""
+    with pd.read_csv(file_path, chunksize=chunk_size) as reader:
+        for chunk in reader:
+            yield chunk
+
+def iter_cleaned_chunks(chunks, dataset_type, na_stats=None):
+    """원본 청크를 정제된 청크로 변환 (NA 통계는 지나가는 청크로 누적)"""
+    for chunk in chunks:
+        if na_stats is not None:
+            na_stats.update(chunk)
+        yield clean_wine_frame(chunk, dataset_type)
+
+# 병렬 정제 큐의 종료 표시
+_END_OF_CHUNKS = object()
+
+def iter_cleaned_chunks_parallel(chunks, dataset_type, workers, na_stats=None):
+    """프로세스 풀에서 청크를 정제하고 원래 순서대로 반환
+    
+    읽기 스레드가 청크를 워커에 제출하고 결과(Future)를 크기 제한 큐에 넣으면,
+    호출한 쪽(단일 writer)이 큐에서 순서대로 꺼내 저장한다.
+    대기 중인 청크 수가 workers * 2로 제한되므로 메모리 사용량은 청크 크기에 비례한다.
+    """
+    pending = queue.Queue(maxsize=workers * 2)
+    stop = threading.Event()
+    executor = ProcessPoolExecutor(max_workers=workers)
+    
+    def put(item):
+        while not stop.is_set():
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce():
+        try:
+            for chunk in chunks:
+                if na_stats is not None:
+                    na_stats.update(chunk)
+                # 청크의 원래 인덱스가 그대로 전달되므로 'Unknown Wine {n}' 번호도 순차 처리와 같음
+                if not put(executor.submit(clean_wine_frame, chunk, dataset_type)):
+                    return
+        except Exception as e:
+            put(e)
+        put(_END_OF_CHUNKS)
+    
+    producer = threading.Thread(target=produce, name="wine-chunk-reader", daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = pending.get()
+            if item is _END_OF_CHUNKS:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item.result()
+    finally:
+        stop.set()
+        producer.join()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def build_cleaned_chunks(file_path, dataset_type, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, na_stats=None):
+    """CSV 청크 읽기 → 정제 파이프라인 구성 (workers가 2 이상이면 프로세스 풀에서 정제)"""
+    chunks = iter_csv_chunks(file_path, chunk_size)
+    if workers and workers > 1:
+        return iter_cleaned_chunks_parallel(chunks, dataset_type, workers, na_stats)
+    return iter_cleaned_chunks(chunks, dataset_type, na_stats)
+
+def build_shadow_table(name):
+    """Wine 테이블과 같은 컬럼 구성의 섀도 테이블 정의 (인덱스 없음)"""
+    return Table(
+        name,
+        MetaData(),
+        *[Column(column.name, column.type, primary_key=column.primary_key) for column in Wine.__table__.columns],
+    )
+
+def create_shadow_indexes(conn, shadow, suffix):
+    """Wine 테이블과 같은 인덱스를 섀도 테이블에 생성
+    
+    인덱스 이름은 DB 전체에서 유일해야 하므로 빌드 ID를 붙인다 (교체 후에도 그대로 유지됨).
+    """
+    for index in Wine.__table__.indexes:
+        shadow_index = Index(
+            f"{index.name}__{suffix}", *[shadow.c[column.name] for column in index.columns], unique=index.unique
+        )
+        shadow_index.create(conn)
+
+def swap_in_shadow_table(shadow_name, fts_shadow_name=None):
+    """섀도 테이블(과 FTS 섀도 테이블)을 wines 테이블로 원자적으로 교체 (하나의 트랜잭션에서 RENAME)"""
+    live_name = Wine.__tablename__
+    old_name = f"{live_name}__old"
+    live_exists = inspect(engine).has_table(live_name)
+    fts_old_name = f"{WINE_FTS_TABLE}__old"
+    fts_live_exists = fts_shadow_name is not None and inspect(engine).has_table(WINE_FTS_TABLE)
+    
+    # pysqlite는 DDL 앞에 BEGIN을 넣지 않으므로 트랜잭션을 직접 연다
+    raw_connection = engine.raw_connection()
+    try:
+        driver_connection = raw_connection.driver_connection
+        isolation_level = driver_connection.isolation_level
+        driver_connection.isolation_level = None
+        cursor = driver_connection.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(f'DROP TABLE IF EXISTS "{old_name}"')
+            if live_exists:
+                cursor.execute(f'ALTER TABLE "{live_name}" RENAME TO "{old_name}"')
+            cursor.execute(f'ALTER TABLE "{shadow_name}" RENAME TO "{live_name}"')
+            if live_exists:
+                cursor.execute(f'DROP TABLE "{old_name}"')
+            if fts_shadow_name is not None:
+                cursor.execute(f'DROP TABLE IF EXISTS "{fts_old_name}"')
+                if fts_live_exists:
+                    cursor.execute(f'ALTER TABLE "{WINE_FTS_TABLE}" RENAME TO "{fts_old_name}"')
+                cursor.execute(f'ALTER TABLE "{fts_shadow_name}" RENAME TO "{WINE_FTS_TABLE}"')
+                if fts_live_exists:
+                    cursor.execute(f'DROP TABLE "{fts_old_name}"')
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.close()
+            driver_connection.isolation_level = isolation_level
+    finally:
+        raw_connection.close()
+
+class WineIdAssigner:
+    """전체 재적재 시 wine_id 배정: 기존 wines에 있던 원본 키는 같은 id를 유지하고, 새 행만 새 id를 받음
+    
+    모델 아티팩트와 이웃 테이블이 wine_id 기준이므로 재적재로 id가 바뀌면 다른 와인을 추천하게 된다.
+    삭제된 와인의 id는 다시 쓰지 않는다 (새 id는 증분 적재와 같은 최고 기록 다음부터, reserve_wine_ids).
+    """
+    
+    def __init__(self, conn):
+        self.conn = conn
+        self.existing = pd.Series(dtype="int64")
+        if inspect(conn).has_table(Wine.__tablename__):
+            table = Wine.__table__
+            rows = conn.execute(select(table.c.source_key, table.c.id).where(table.c.source_key.isnot(None))).all()
+            self.existing = pd.Series([row[1] for row in rows], index=[row[0] for row in rows], dtype="int64")
+        # 새 파일에 없는 기존 와인의 id도 다시 배정되지 않도록 교체 전에 현재 최고 id를 기록
+        reserve_wine_ids(conn, 0)
+        self.used = set()
+        self.carried = 0
+    
+    def assign(self, wines):
+        """wines에 id 열을 붙인 데이터프레임 (같은 원본 키가 파일에 여러 번 나오면 두 번째부터 새 id)"""
+        ids = wines["source_key"].map(self.existing)
+        duplicated = wines["source_key"].duplicated() | ids.isin(self.used)
+        ids[duplicated] = np.nan
+        new_rows = ids.isna()
+        new_count = int(new_rows.sum())
+        if new_count:
+            first_id = reserve_wine_ids(self.conn, new_count)
+            ids[new_rows] = np.arange(first_id, first_id + new_count)
+        ids = ids.astype("int64")
+        self.used.update(ids[~new_rows].tolist())
+        self.carried += int((~new_rows).sum())
+        return wines.assign(id=ids.to_numpy())
+
+def rebuild_wine_table(cleaned_chunks, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """섀도 테이블에 전체 데이터를 적재하고 인덱스를 만든 뒤 wines 테이블과 교체
+    
+    적재 중에도 API는 기존 wines 테이블을 그대로 조회한다.
+    기존 와인은 원본 키(source_key)로 찾아 같은 wine_id를 유지한다 (WineIdAssigner).
+    progress(phase, rows)가 주어지면 단계와 처리 행 수를 알린다.
+    """
+    build_id = uuid.uuid4().hex[:8]
+    shadow_name = f"{Wine.__tablename__}__shadow"
+    shadow = build_shadow_table(shadow_name)
+    fts_shadow_name = f"{WINE_FTS_TABLE}__shadow" if FTS_ENABLED else None
+    notify = progress or (lambda phase, rows: None)
+    
+    def drop_shadows(conn):
+        shadow.drop(conn, checkfirst=True)
+        if fts_shadow_name is not None:
+            conn.execute(text(f'DROP TABLE IF EXISTS "{fts_shadow_name}"'))
+    
+    with engine.begin() as conn:
+        drop_shadows(conn)
+        shadow.create(conn)
+    
+    try:
+        inserted = 0
+        notify("loading", inserted)
+        with engine.begin() as conn:
+            id_assigner = WineIdAssigner(conn)
+            for wines in cleaned_chunks:
+                inserted += insert_wine_records(conn, id_assigner.assign(wines), chunk_size, shadow)
+                notify("loading", inserted)
+        
+        notify("indexing", inserted)
+        with engine.begin() as conn:
+            create_shadow_indexes(conn, shadow, build_id)
+            # 전문 검색 색인도 섀도 테이블에서 만들어 함께 교체
+            if fts_shadow_name is not None:
+                create_wine_fts_table(conn, fts_shadow_name)
+                populate_wine_fts(conn, fts_shadow_name, source=shadow_name)
+        
+        notify("swapping", inserted)
+        swap_in_shadow_table(shadow_name, fts_shadow_name)
+    except Exception:
+        with engine.begin() as conn:
+            drop_shadows(conn)
+        raise
+    
+    finish_ingest()
+    notify("done", inserted)
+    return inserted
+
+def stream_wine_data(file_path, dataset_type, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """CSV를 청크 단위로 읽고 정제/저장 (최대 메모리는 파일 크기가 아닌 chunk_size에 비례)"""
+    na_stats = NAStatistics()
+    started = time.perf_counter()
+    
+    try:
+        cleaned_chunks = build_cleaned_chunks(file_path, dataset_type, chunk_size, workers, na_stats)
+        successful_inserts = rebuild_wine_table(cleaned_chunks, chunk_size)
+        
+        elapsed = time.perf_counter() - started
+        na_stats.report()
+        print(f"데이터베이스 저장 완료 (청크 크기 {chunk_size}, 정제 워커 {workers or 1}개):")
+        print(f"  - 성공: {successful_inserts}개")
+        print(f"  - 소요 시간: {elapsed:.2f}초 ({format_rate(successful_inserts, elapsed)})")
+        
+        db = SessionLocal()
+        try:
+            verify_data(db)
+        finally:
+            db.close()
+        return True
+        
+    except Exception as e:
+        print(f"데이터 처리 중 오류 발생: {e}")
+        return False
+
+def upsert_wine_chunks(cleaned_chunks, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    """원본 키 기준으로 새 행은 INSERT, 바뀐 행은 UPDATE, 사라진 행은 DELETE하고 변경 요약 반환"""
+    table = Wine.__table__
+    notify = progress or (lambda phase, rows: None)
+    summary = {"added": 0, "changed": 0, "unchanged": 0, "removed": 0, "legacy_removed": 0}
+    update_statement = (
+        update(table)
+        .where(table.c.source_key == bindparam("b_source_key"))
+    )
+    
+    with engine.begin() as conn:
+        # 현재 저장된 키 → 해시 (원본 키가 없는 기존 행은 매칭할 수 없으므로 삭제 대상)
+        existing = conn.execute(select(table.c.source_key, table.c.content_hash)).all()
+        existing_hashes = pd.Series(
+            {source_key: content_hash for source_key, content_hash in existing if source_key is not None},
+            dtype=object,
+        )
+        legacy_rows = len(existing) - len(existing_hashes)
+        seen_keys = set()
+        
+        notify("loading", 0)
+        for wines in cleaned_chunks:
+            # 같은 키가 여러 번 나오면 처음 나온 행만 사용
+            duplicated = wines["source_key"].duplicated() | wines["source_key"].isin(seen_keys)
+            wines = wines[~duplicated]
+            seen_keys.update(wines["source_key"])
+            
+            known = wines["source_key"].isin(existing_hashes.index)
+            new_wines = wines[~known]
+            if len(new_wines):
+                first_id = reserve_wine_ids(conn, len(new_wines))
+                new_wines = new_wines.assign(id=np.arange(first_id, first_id + len(new_wines)))
+            summary["added"] += insert_wine_records(conn, new_wines, chunk_size)
+            if FTS_ENABLED:
+                populate_wine_fts(conn, source_keys=wines.loc[~known, "source_key"].tolist())
+            
+            known_wines = wines[known]
+            previous_hashes = known_wines["source_key"].map(existing_hashes)
+            changed_wines = known_wines[known_wines["content_hash"] != previous_hashes]
+            summary["unchanged"] += len(known_wines) - len(changed_wines)
+            if len(changed_wines):
+                records = changed_wines.rename(columns={"source_key": "b_source_key"}).to_dict("records")
+                for start in range(0, len(records), chunk_size):
+                    conn.execute(update_statement, records[start:start + chunk_size])
+                summary["changed"] += len(changed_wines)
+                if FTS_ENABLED:
+                    changed_keys = changed_wines["source_key"].tolist()
+                    delete_wine_fts(conn, changed_keys)
+                    populate_wine_fts(conn, source_keys=changed_keys)
+            notify("loading", len(seen_keys))
+        
+        notify("deleting", len(seen_keys))
+        # 삭제할 와인의 id도 다시 배정되지 않도록 현재 최고 id를 기록
+        reserve_wine_ids(conn, 0)
+        missing_keys = [key for key in existing_hashes.index if key not in seen_keys]
+        if FTS_ENABLED:
+            delete_wine_fts(conn, missing_keys)
+        for start in range(0, len(missing_keys), 500):
+            conn.execute(delete(table).where(table.c.source_key.in_(missing_keys[start:start + 500])))
+        summary["removed"] = len(missing_keys)
+        if legacy_rows:
+            if FTS_ENABLED:
+                delete_wine_fts(conn, legacy=True)
+            conn.execute(delete(table).where(table.c.source_key.is_(None)))
+            summary["removed"] += legacy_rows
+            summary["legacy_removed"] = legacy_rows
+        
+        # 바뀐 행이 있으면 같은 트랜잭션에서 데이터 버전과 통계를 갱신
+        if summary["added"] or summary["changed"] or summary["removed"]:
+            finish_ingest(conn)
+    
+    notify("done", len(seen_keys))
+    return summary
+
+def sync_wine_data(file_path, dataset_type, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """증분 적재: 원본 키 기준으로 새 행은 INSERT, 바뀐 행은 UPDATE, 사라진 행은 DELETE"""
+    na_stats = NAStatistics()
+    started = time.perf_counter()
+    
+    try:
+        cleaned_chunks = build_cleaned_chunks(file_path, dataset_type, chunk_size, workers, na_stats)
+        summary = upsert_wine_chunks(cleaned_chunks, chunk_size)
+        
+        elapsed = time.perf_counter() - started
+        processed = summary["added"] + summary["changed"] + summary["unchanged"]
+        legacy_rows = summary["legacy_removed"]
+        na_stats.report()
+        print(f"증분 적재 완료:")
+        print(f"  - 추가: {summary['added']}개")
+        print(f"  - 변경: {summary['changed']}개")
+        print(f"  - 삭제: {summary['removed']}개" + (f" (원본 키가 없는 기존 행 {legacy_rows}개 포함)" if legacy_rows else ""))
+        print(f"  - 변경 없음: {summary['unchanged']}개")
+        print(f"  - 소요 시간: {elapsed:.2f}초 ({format_rate(processed, elapsed)})")
+        return True
+        
+    except Exception as e:
+        print(f"증분 적재 중 오류 발생: {e}")
+        return False
+
+def process_wine_data(df, dataset_type, chunk_size=DEFAULT_CHUNK_SIZE):
+    """와인 데이터 처리 및 저장 (컬럼 단위 정제 + 섀도 테이블 벌크 INSERT 후 교체)"""
     # NA 값 분석
     analyze_na_values(df)
     
-    # 세션 생성
-    db = SessionLocal()
+    started = time.perf_counter()
     
     try:
-        # 기존 데이터 삭제
-        db.query(Wine).delete()
+        # 컬럼 단위로 한 번에 정제
+        wines = clean_wine_frame(df, dataset_type)
         
-        # 데이터 처리 및 저장
-        successful_inserts = 0
-        failed_inserts = 0
+        # 섀도 테이블에 적재한 뒤 교체하므로 적재 중에도 기존 데이터가 조회됨
+        successful_inserts = rebuild_wine_table([wines], chunk_size)
         
-        for index, row in df.iterrows():
-            try:
-                # 데이터셋 타입에 따라 컬럼 매핑
-                if dataset_type == "winemag":
-                    # 실제 데이터셋 컬럼 매핑
-                    wine = Wine(
-                        title=safe_string_value(row.get('title'), f'Unknown Wine {index + 1}'),
-                        country=safe_string_value(row.get('country'), 'Unknown'),
-                        province=safe_string_value(row.get('province'), 'Unknown'),
-                        region=safe_string_value(row.get('region_1'), 'Unknown'),
-                        winery=safe_string_value(row.get('winery'), 'Unknown'),
-                        variety=safe_string_value(row.get('variety'), 'Unknown'),
-                        designation=safe_string_value(row.get('designation'), 'Unknown'),
-                        points=safe_int_value(row.get('points'), 0),
-                        price=safe_float_value(row.get('price'), None),
-                        description=safe_string_value(row.get('description'), 'No description available'),
-                        taster_name=safe_string_value(row.get('taster_name'), 'Unknown'),
-                        taster_twitter_handle=safe_string_value(row.get('taster_twitter_handle'), 'Unknown'),
-                    )
-                
-                else:
-                    # 샘플 데이터셋 컬럼 매핑 (기존 로직)
-                    wine = Wine(
-                        title=safe_string_value(row.get('title'), f'Unknown Wine {index + 1}'),
-                        country=safe_string_value(row.get('country'), 'Unknown'),
-                        province=safe_string_value(row.get('province'), 'Unknown'),
-                        region=safe_string_value(row.get('region_1'), 'Unknown'),
-                        winery=safe_string_value(row.get('winery'), 'Unknown'),
-                        variety=safe_string_value(row.get('variety'), 'Unknown'),
-                        designation=safe_string_value(row.get('designation'), 'Unknown'),
-                        points=safe_int_value(row.get('points'), 0),
-                        price=safe_float_value(row.get('price'), None),
-                        description=safe_string_value(row.get('description'), 'No description available'),
-                        taster_name=safe_string_value(row.get('taster_name'), 'Unknown'),
-                        taster_twitter_handle=safe_string_value(row.get('taster_twitter_handle'), 'Unknown'),
-                    )
-                
-                db.add(wine)
-                successful_inserts += 1
-                
-            except Exception as e:
-                print(f"행 {index + 1} 처리 중 오류: {e}")
-                failed_inserts += 1
-                continue
-        
-        db.commit()
+        elapsed = time.perf_counter() - started
         print(f"데이터베이스 저장 완료:")
         print(f"  - 성공: {successful_inserts}개")
-        print(f"  - 실패: {failed_inserts}개")
+        print(f"  - 소요 시간: {elapsed:.2f}초 ({format_rate(successful_inserts, elapsed)})")
         
         # 저장된 데이터 검증
-        verify_data(db)
+        db = SessionLocal()
+        try:
+            verify_data(db)
+        finally:
+            db.close()
         
     except Exception as e:
         print(f"데이터 처리 중 오류 발생: {e}")
-        db.rollback()
-    finally:
-        db.close()
+
+def find_dataset(dataset_id):
+    """데이터셋 ID로 (ID, 이름, 파일 경로) 조회 (없으면 None)"""
+    for dataset in get_available_datasets():
+        if dataset[0] == dataset_id:
+            return dataset
+    return None
+
+def reload_dataset(dataset_id, chunk_size=DEFAULT_CHUNK_SIZE, incremental=False, progress=None, workers=None):
+    """출력 없이 데이터셋을 다시 적재 (백그라운드 작업용, 오류는 그대로 전달)"""
+    dataset = find_dataset(dataset_id)
+    if dataset is None:
+        raise ValueError(f"데이터셋을 찾을 수 없습니다: {dataset_id}")
+    _, _, file_path = dataset
+    cleaned_chunks = build_cleaned_chunks(file_path, dataset_id, chunk_size, workers)
+    if incremental:
+        return upsert_wine_chunks(cleaned_chunks, chunk_size, progress)
+    return {"loaded": rebuild_wine_table(cleaned_chunks, chunk_size, progress)}
 
 def load_wine_data():
     """와인 데이터 로드 (환경변수 DATASET_CHOICE 활용)"""
@@ -209,8 +881,14 @@ def load_wine_data():
             print("데이터 로드에 실패했습니다. 테스트용 샘플 데이터를 생성합니다.")
             create_test_data()
 
-def load_selected_data(dataset_choice=None):
-    """선택된 데이터셋 로드"""
+def load_selected_data(dataset_choice=None, chunk_size=None, incremental=False, workers=None):
+    """선택된 데이터셋 로드
+    
+    chunk_size를 주면 스트리밍, incremental이면 변경분만 반영,
+    workers가 2 이상이면 정제를 프로세스 풀에서 병렬로 실행한다 (스트리밍 방식).
+    """
+    if workers and workers > 1 and not chunk_size:
+        chunk_size = DEFAULT_CHUNK_SIZE
     datasets = get_available_datasets()
     
     if not datasets:
@@ -249,6 +927,16 @@ def load_selected_data(dataset_choice=None):
     
     print(f"\n선택된 데이터셋: {dataset_name}")
     
+    if incremental:
+        sync_wine_data(file_path, dataset_id, chunk_size or DEFAULT_CHUNK_SIZE, workers)
+        return
+    
+    if chunk_size:
+        if not stream_wine_data(file_path, dataset_id, chunk_size, workers):
+            print("데이터 로드에 실패했습니다. 테스트용 샘플 데이터를 생성합니다.")
+            create_test_data()
+        return
+    
     df = load_data_from_file(file_path)
     
     if df is not None:
@@ -307,14 +995,20 @@ def create_test_data():
     ]
     
     try:
-        # 기존 데이터 삭제
+        # 삭제할 와인의 id를 다시 쓰지 않도록 기존 데이터를 지우기 전에 새 id 배정
+        first_id = reserve_wine_ids(db.connection(), len(test_wines))
         db.query(Wine).delete()
         
         # 테스트 데이터 추가
-        for wine in test_wines:
+        for offset, wine in enumerate(test_wines):
+            wine.id = first_id + offset
             db.add(wine)
         
         db.commit()
+        with engine.begin() as conn:
+            backfill_lookup_columns(conn)
+        rebuild_wine_fts()
+        finish_ingest()
         print(f"테스트용 {len(test_wines)}개의 와인 데이터가 생성되었습니다.")
         
         # 저장된 데이터 검증
@@ -359,43 +1053,274 @@ def verify_data(db):
     except Exception as e:
         print(f"데이터 검증 중 오류: {e}")
 
-def get_db():
-    """데이터베이스 세션 반환"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# 동시에 열어 두는 요청 세션 수 (연결 풀 크기까지)
+request_sessions = anyio.Semaphore(DB_POOL_SIZE)
 
-def get_wine_statistics():
-    """와인 데이터 통계 조회"""
-    db = SessionLocal()
-    try:
-        total_wines = db.query(Wine).count()
-        countries = db.query(Wine.country).distinct().count()
-        varieties = db.query(Wine.variety).distinct().count()
-        avg_points = db.query(Wine.points).filter(Wine.points > 0).all()
-        avg_price = db.query(Wine.price).filter(Wine.price.is_not(None)).all()
-        
-        if avg_points:
-            avg_points_value = sum([w.points for w in avg_points]) / len(avg_points)
-        else:
-            avg_points_value = 0
-            
-        if avg_price:
-            avg_price_value = sum([w.price for w in avg_price]) / len(avg_price)
-        else:
-            avg_price_value = 0
-        
-        return {
-            "total_wines": total_wines,
-            "countries": countries,
-            "varieties": varieties,
-            "avg_points": round(avg_points_value, 1),
-            "avg_price": round(avg_price_value, 2)
+async def get_db():
+    """데이터베이스 세션 반환 (요청용 FastAPI 의존성)
+    
+    세션은 응답을 보낸 뒤에 닫히므로, 연결 수보다 많은 요청이 스레드를 잡고 연결을 기다리면 연결을 가진
+    요청은 응답 검증에 쓸 스레드를 얻지 못해 풀 타임아웃까지 서로 막힌다. 세션 수를 이벤트 루프에서 연결 풀
+    크기로 제한하고 세션도 이벤트 루프에서 닫으므로, 스레드 풀의 스레드는 연결을 기다리지 않는다.
+    """
+    async with request_sessions:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+def get_all_wine_ids():
+    """현재 카탈로그의 전체 wine_id 배열 (모델 커버리지 검사용)"""
+    with engine.connect() as conn:
+        return np.array(conn.execute(select(Wine.id)).scalars().all(), dtype=np.int64)
+
+def hash_source_keys(keys) -> np.ndarray:
+    """원본 키(source_key) 배열의 64비트 해시 (모델 아티팩트의 wine_id ↔ 원본 행 대응 확인용)"""
+    return pd.util.hash_array(np.asarray(keys, dtype=object))
+
+def get_wine_key_hashes():
+    """현재 카탈로그의 (wine_id 배열, source_key 해시 배열)"""
+    with engine.connect() as conn:
+        rows = conn.execute(select(Wine.id, Wine.source_key)).all()
+    ids = np.array([row[0] for row in rows], dtype=np.int64)
+    return ids, hash_source_keys([row[1] for row in rows])
+
+def iter_wine_batches(columns, batch_size=DEFAULT_CHUNK_SIZE):
+    """wines 테이블을 id 순서로 batch_size 행씩 읽어 DataFrame으로 반환
+    
+    OFFSET 대신 마지막 id 이후를 조회(keyset)하므로 뒤쪽 배치도 인덱스 탐색 한 번으로 읽는다.
+    """
+    selected = [Wine.id] + [getattr(Wine, name) for name in columns if name != "id"]
+    last_id = -1
+    with engine.connect() as conn:
+        while True:
+            rows = conn.execute(
+                select(*selected).where(Wine.id > last_id).order_by(Wine.id).limit(batch_size)
+            ).all()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield pd.DataFrame(rows, columns=[column.key for column in selected])
+
+def get_meta_values(conn, prefix):
+    """app_meta에서 prefix로 시작하는 키-값 조회 (prefix는 제거한 키로 반환)"""
+    rows = conn.execute(select(AppMeta.key, AppMeta.value).where(AppMeta.key.startswith(prefix))).all()
+    return {key[len(prefix):]: value for key, value in rows}
+
+def set_meta_values(conn, prefix, values):
+    """app_meta에 키-값 저장 (있으면 덮어씀)"""
+    keys = [f"{prefix}{key}" for key in values]
+    conn.execute(delete(AppMeta).where(AppMeta.key.in_(keys)))
+    conn.execute(insert(AppMeta), [{"key": f"{prefix}{key}", "value": str(value)} for key, value in values.items()])
+
+NEIGHBOR_META_PREFIX = "neighbors."
+# 요청마다 메타 테이블을 읽지 않도록 짧게 캐시 (초)
+NEIGHBOR_INFO_TTL = 30.0
+_neighbor_info_cache = {}
+
+def store_wine_neighbors(neighbor_blocks, k, model_version, data_version, progress=None):
+    """사전 계산된 이웃 블록 (wine_ids, neighbor_ids[b×k], scores[b×k])을 wine_neighbors에 저장
+    
+    data_version은 이웃의 wine_id가 유효한 데이터 버전으로, 조회 API는 현재 데이터 버전과 같을 때만 사용한다.
+    삭제와 적재를 한 트랜잭션에서 처리하므로 적재 중에도 이전 이웃 테이블이 조회된다.
+    블록 단위로 INSERT하므로 메모리는 블록 크기에만 비례한다.
+    """
+    table = WineNeighbor.__table__
+    notify = progress or (lambda rows: None)
+    stored_wines = 0
+    ranks = np.arange(k, dtype=np.int64)
+    
+    with engine.begin() as conn:
+        conn.execute(delete(table))
+        for wine_ids, neighbor_ids, scores in neighbor_blocks:
+            wine_ids = np.asarray(wine_ids, dtype=np.int64)
+            width = neighbor_ids.shape[1]
+            records = pd.DataFrame({
+                "wine_id": np.repeat(wine_ids, width),
+                "rank": np.tile(ranks[:width], len(wine_ids)),
+                "neighbor_id": np.asarray(neighbor_ids, dtype=np.int64).ravel(),
+                "score": np.asarray(scores, dtype=np.float64).ravel(),
+            }).to_dict("records")
+            if records:
+                conn.execute(insert(table), records)
+            stored_wines += len(wine_ids)
+            notify(stored_wines)
+        set_meta_values(conn, NEIGHBOR_META_PREFIX, {
+            "k": k,
+            "model_version": model_version,
+            "data_version": data_version,
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "wines": stored_wines,
+        })
+    
+    _neighbor_info_cache.clear()
+    return stored_wines
+
+def get_neighbor_table_info(db):
+    """사전 계산 이웃 테이블의 K, 모델 버전, 데이터 버전 (없으면 None, 데이터 버전을 기록하기 전 테이블이면 data_version=None)"""
+    cached = _neighbor_info_cache.get("info")
+    if cached is not None and time.monotonic() - cached[0] < NEIGHBOR_INFO_TTL:
+        return cached[1]
+    
+    values = get_meta_values(db.connection(), NEIGHBOR_META_PREFIX)
+    info = None
+    if "k" in values and "model_version" in values:
+        info = {
+            "k": int(values["k"]),
+            "model_version": values["model_version"],
+            "data_version": int(values["data_version"]) if "data_version" in values else None,
+            "built_at": values.get("built_at"),
         }
-    finally:
-        db.close()
+    _neighbor_info_cache["info"] = (time.monotonic(), info)
+    return info
+
+DATA_META_PREFIX = "data."
+# 국가/품종별 집계에 포함하는 항목 수 (와인 수 상위)
+STATS_BREAKDOWN_LIMIT = 50
+STATS_PRICE_PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+def get_data_version(conn):
+    """적재가 끝날 때마다 1씩 증가하는 데이터 버전 (한 번도 적재하지 않았으면 0)"""
+    return int(get_meta_values(conn, DATA_META_PREFIX).get("version", 0))
+
+def get_wine_id_high_water(conn):
+    """지금까지 배정한 가장 큰 wine_id (삭제된 와인 포함, 기록 전 DB는 현재 wines의 최대 id)"""
+    stored = int(get_meta_values(conn, DATA_META_PREFIX).get("max_wine_id", 0))
+    current = 0
+    if inspect(conn).has_table(Wine.__tablename__):
+        current = conn.execute(select(func.max(Wine.id))).scalar() or 0
+    return max(stored, current)
+
+def reserve_wine_ids(conn, count):
+    """새 wine_id count개를 배정하고 첫 id 반환 (count=0이면 현재 최고 id만 기록)
+    
+    모델 아티팩트와 이웃 테이블이 wine_id 기준이므로 삭제된 와인의 id를 새 와인에 다시 주면
+    다른 와인을 추천하게 된다. SQLite 기본 rowid(max+1)와 달리 app_meta의 최고 기록 다음부터 배정한다.
+    """
+    first_id = get_wine_id_high_water(conn) + 1
+    set_meta_values(conn, DATA_META_PREFIX, {"max_wine_id": first_id + count - 1})
+    return first_id
+
+def rounded(value, digits):
+    """SQL 집계 결과 반올림 (NULL은 그대로)"""
+    return None if value is None else round(float(value), digits)
+
+def compute_wine_statistics(conn):
+    """와인 통계를 SQL 집계로 계산 (전체 요약, 국가/품종별 집계, 가격 백분위수, 점수 분포)"""
+    columns = Wine.__table__.c
+    # 점수 0은 결측값이므로 평균에서 제외
+    scored_points = case((columns.points > 0, columns.points))
+    summary = conn.execute(select(
+        func.count(),
+        func.count(func.distinct(columns.country)),
+        func.count(func.distinct(columns.variety)),
+        func.avg(scored_points),
+        func.avg(columns.price),
+        func.count(columns.price),
+        func.min(columns.price),
+        func.max(columns.price),
+    )).one()
+    total_wines, countries, varieties, avg_points, avg_price, priced_wines, min_price, max_price = summary
+    
+    def breakdown(column):
+        rows = conn.execute(
+            select(column, func.count(), func.avg(scored_points), func.avg(columns.price))
+            .group_by(column)
+            .order_by(func.count().desc(), column)
+            .limit(STATS_BREAKDOWN_LIMIT)
+        ).all()
+        return [
+            {"name": name, "count": count, "avg_points": rounded(points, 1), "avg_price": rounded(price, 2)}
+            for name, count, points, price in rows
+        ]
+    
+    # 가격 백분위수 (nearest-rank): 가격 순 행 번호를 매겨 필요한 순위의 값만 조회
+    percentiles = {}
+    if priced_wines:
+        ranks = {p: max(1, math.ceil(p / 100 * priced_wines)) for p in STATS_PRICE_PERCENTILES}
+        ranked = (
+            select(columns.price, func.row_number().over(order_by=columns.price).label("rank"))
+            .where(columns.price.is_not(None))
+            .subquery()
+        )
+        prices = dict(conn.execute(
+            select(ranked.c.rank, ranked.c.price).where(ranked.c.rank.in_(set(ranks.values())))
+        ).all())
+        percentiles = {f"p{p}": prices[rank] for p, rank in ranks.items()}
+    
+    histogram = conn.execute(
+        select(columns.points, func.count()).group_by(columns.points).order_by(columns.points)
+    ).all()
+    
+    return {
+        "total_wines": total_wines,
+        "countries": countries,
+        "varieties": varieties,
+        "avg_points": rounded(avg_points, 1) or 0,
+        "avg_price": rounded(avg_price, 2) or 0,
+        "price": {"wines": priced_wines, "min": min_price, "max": max_price, "percentiles": percentiles},
+        "points_histogram": {str(points): count for points, count in histogram},
+        "by_country": breakdown(columns.country),
+        "by_variety": breakdown(columns.variety),
+    }
+
+def current_wine_statistics(conn):
+    """현재 데이터 버전의 통계를 계산만 해서 반환 (wine_stats에 저장하지 않음)"""
+    return {
+        **compute_wine_statistics(conn),
+        "data_version": get_data_version(conn),
+        "refreshed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def refresh_wine_stats(conn=None):
+    """현재 데이터 버전으로 통계를 다시 계산해 wine_stats에 저장하고 반환"""
+    if conn is None:
+        with engine.begin() as conn:
+            return refresh_wine_stats(conn)
+    
+    stats = compute_wine_statistics(conn)
+    row = {
+        "id": 1,
+        "data_version": get_data_version(conn),
+        "refreshed_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "stats": json.dumps(stats, ensure_ascii=False),
+    }
+    conn.execute(delete(WineStats.__table__))
+    conn.execute(insert(WineStats.__table__), [row])
+    return {**stats, "data_version": row["data_version"], "refreshed_at": row["refreshed_at"]}
+
+def finish_ingest(conn=None):
+    """적재 마지막 단계: 데이터 버전을 올리고 wine_stats 갱신 (새 데이터 버전 반환)"""
+    if conn is None:
+        with engine.begin() as conn:
+            return finish_ingest(conn)
+    
+    version = get_data_version(conn) + 1
+    set_meta_values(conn, DATA_META_PREFIX, {"version": version, "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S")})
+    refresh_wine_stats(conn)
+    return version
+
+def ensure_wine_stats():
+    """wine_stats가 비어 있으면 현재 wines 내용으로 계산 (통계 테이블 추가 전에 적재된 DB)"""
+    with engine.begin() as conn:
+        if conn.execute(select(WineStats.id)).first() is None:
+            refresh_wine_stats(conn)
+
+def get_wine_statistics(db):
+    """미리 계산된 와인 통계 조회 (wine_stats 한 행)
+    
+    행이 없으면 이 응답용으로만 계산하고 저장하지 않는다 (조회 API가 쓰기를 하지 않도록,
+    갱신은 적재 마지막 단계 finish_ingest와 서버 시작 시 ensure_wine_stats가 담당).
+    """
+    row = db.get(WineStats, 1)
+    if row is None:
+        return current_wine_statistics(db.connection())
+    return wine_stats_response(row)
+
+def wine_stats_response(row):
+    """wine_stats 행 → 통계 응답"""
+    return {**json.loads(row.stats), "data_version": row.data_version, "refreshed_at": row.refreshed_at}
 
 if __name__ == "__main__":
     import sys
@@ -433,11 +1358,16 @@ if __name__ == "__main__":
     else:
         load_selected_data()  # 대화형 선택
     
-    # 통계 출력
-    stats = get_wine_statistics()
+    # 통계 출력 (국가/품종별 집계 등 상세 항목은 /wines/stats/에서 확인)
+    db = SessionLocal()
+    try:
+        stats = get_wine_statistics(db)
+    finally:
+        db.close()
     print("=== 데이터베이스 통계 ===")
     for key, value in stats.items():
-        print(f"{key}: {value}")
+        if not isinstance(value, (dict, list)):
+            print(f"{key}: {value}")
     print("========================")
     
     print("\n데이터베이스 설정이 완료되었습니다!")
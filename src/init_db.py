@@ -4,14 +4,38 @@
 """
 
 import os
-import sys
+import argparse
 from dotenv import load_dotenv
-from database.setup import create_tables, get_available_datasets, load_selected_data, get_wine_statistics
+from database.setup import create_tables, get_available_datasets, load_selected_data, get_wine_statistics, SessionLocal
 
 # .env 파일 로드
 load_dotenv()
 
+def parse_args(argv=None):
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="와인 데이터베이스 초기화")
+    parser.add_argument("dataset", nargs="?", help="데이터셋 ID (sample_csv, winemag)")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=int(os.getenv("INGEST_STREAM_CHUNK_SIZE") or 0) or None,
+        help="지정하면 CSV를 이 행 수 단위로 스트리밍 적재 (최대 메모리가 청크 크기에 비례)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("INGEST_WORKERS") or 1),
+        help="데이터 정제에 사용할 프로세스 수 (2 이상이면 청크 단위 병렬 정제 후 단일 writer가 저장)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="전체 재적재 대신 추가/변경/삭제된 행만 반영",
+    )
+    return parser.parse_args(argv)
+
 def main():
+    args = parse_args()
     print("=== 와인 데이터베이스 초기화 ===")
     
     # 테이블 생성
@@ -40,28 +64,44 @@ def main():
         print(f"\n3. .env 파일에서 선택된 데이터셋: {dataset_choice}")
     
     # 명령행 인자 확인
-    elif len(sys.argv) > 1:
-        dataset_choice = sys.argv[1]
+    elif args.dataset:
+        dataset_choice = args.dataset
         print(f"\n3. 명령행 인자에서 선택된 데이터셋: {dataset_choice}")
     
     # 데이터 로드
     print("\n4. 데이터 로드 중...")
+    if args.incremental:
+        print("   증분 적재 모드")
+    elif args.chunk_size:
+        print(f"   스트리밍 적재 모드 (청크 크기: {args.chunk_size})")
+    if args.workers > 1:
+        print(f"   병렬 정제 워커: {args.workers}개")
+    load_options = {"chunk_size": args.chunk_size, "incremental": args.incremental, "workers": args.workers}
     if dataset_choice:
-        load_selected_data(dataset_choice)
+        load_selected_data(dataset_choice, **load_options)
     else:
-        load_selected_data()  # 대화형 선택
+        load_selected_data(**load_options)  # 대화형 선택
     
     # 통계 출력
     print("\n5. 데이터베이스 통계:")
-    stats = get_wine_statistics()
+    db = SessionLocal()
+    try:
+        stats = get_wine_statistics(db)
+    finally:
+        db.close()
+    # 국가/품종별 집계 등 상세 항목은 /wines/stats/에서 확인
     for key, value in stats.items():
-        print(f"   {key}: {value}")
+        if not isinstance(value, (dict, list)):
+            print(f"   {key}: {value}")
     
     print("\n=== 초기화 완료 ===")
     print("\n사용법:")
     print("1. .env 파일 사용: DATASET_CHOICE=sample_csv 설정 후 실행")
     print("2. 명령행 인자 사용: python src/init_db.py sample_csv")
     print("3. 대화형 선택: python src/init_db.py")
+    print("4. 스트리밍 적재: python src/init_db.py winemag --chunk-size 10000")
+    print("5. 증분 적재: python src/init_db.py winemag --incremental")
+    print("6. 병렬 정제: python src/init_db.py winemag --chunk-size 10000 --workers 4")
     print("\n사용 가능한 데이터셋 ID:")
     for dataset_id, dataset_name, file_path in datasets:
         print(f"   - {dataset_id}: {dataset_name}")